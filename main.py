@@ -1,3 +1,13 @@
+import os
+import sys
+import time
+STARTUP_CLOCK = time.perf_counter()  # 시작 시간 측정 기준 (다른 모듈을 불러오기 전)
+# 명령줄 일괄 렌더링 모드에서는 창을 만들지 않고 Kivy 인자 파싱도 하지 않음
+HEADLESS_COMMANDS = ('render',)
+HEADLESS_MODE = len(sys.argv) > 1 and sys.argv[1] in HEADLESS_COMMANDS
+if HEADLESS_MODE:
+    os.environ.setdefault('KIVY_NO_ARGS', '1')
+    os.environ.setdefault('KIVY_WINDOW', '')
 import kivy
 kivy.require('2.2.1')
 from kivy.logger import Logger
@@ -9,59 +19,138 @@ from kivy.uix.button import Button
 from kivy.uix.label import Label
 from kivy.uix.textinput import TextInput
 from kivy.uix.scrollview import ScrollView
-from kivy.uix.gridlayout import GridLayout
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
 from kivy.core.window import Window
 from kivy.clock import Clock
 from kivy.uix.filechooser import FileChooserListView
 from kivy.uix.popup import Popup
+from kivy.uix.progressbar import ProgressBar
 from kivy.metrics import dp
 import threading
 from kivy.utils import platform
-from google.cloud import texttospeech
 import logging
 import shutil
-from jnius import PythonJavaClass, java_method
 logging.basicConfig(level=logging.DEBUG)
 
 
 GOOGLE_TTS_AVAILABLE = False  # Google TTS 비활성화
-if platform != 'android':
-    from gtts import gTTS
 
-import tempfile
 from kivy.uix.spinner import Spinner
 from kivy.graphics import Color, Rectangle
 from kivy.uix.widget import Widget
-import time
 import json
-import os
 import re
+import io
+import hashlib
+from collections import OrderedDict
+from xml.sax.saxutils import escape, quoteattr
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+import argparse
+import queue
+import sqlite3
+import codecs
+import csv
+import html
+import unicodedata
+import bisect
+import heapq
+import itertools
+import mmap
+import struct
+import random
+from array import array
+from contextlib import contextmanager
 from kivy.core.audio import SoundLoader
 from kivy.core.text import LabelBase
 from kivy.config import Config
 Config.set('kivy', 'kivy_copy_default_data', '0')
 from kivy.resources import resource_add_path
 
-# Android 플랫폼 관련 설정
-if platform == 'android':
-    try:
+# TTS 백엔드(google.cloud.texttospeech, gtts)와 jnius는 불러오는 데 오래 걸리므로
+# 첫 화면을 그린 뒤 처음 쓸 때 불러옴
+texttospeech = None
+gTTS = None
+android_classes_loaded = False
+android_classes_lock = threading.Lock()
+
+def load_google_tts():
+    global texttospeech
+    if texttospeech is None:
+        from google.cloud import texttospeech as module
+        texttospeech = module
+    return texttospeech
+
+def load_gtts():
+    global gTTS
+    if gTTS is None:
+        try:
+            from gtts import gTTS as module
+        except ImportError:
+            print("TTS 라이브러리를 설치하세요: pip install gtts")
+            raise
+        gTTS = module
+    return gTTS
+
+def load_android_classes():
+    """안드로이드 자바 클래스와 TTS 리스너를 처음 쓸 때 불러옴 (안드로이드에서만 호출)"""
+    global android_classes_loaded, PythonActivity, activity, Locale, TextToSpeech, TextToSpeechEngine
+    global HashMap, Context, PowerManager, TTSInitListener, TTSUtteranceListener
+    with android_classes_lock:
+        if android_classes_loaded:
+            return
         from jnius import autoclass, PythonJavaClass, java_method
         PythonActivity = autoclass('org.kivy.android.PythonActivity')
         activity = PythonActivity.mActivity
         Locale = autoclass('java.util.Locale')
         TextToSpeech = autoclass('android.speech.tts.TextToSpeech')
-    except ImportError:
-        class DummyClass:
-            pass
-        PythonActivity = DummyClass()
-        activity = None
-        Locale = DummyClass()
-        TextToSpeech = DummyClass()
-else:
-    try:
-        from gtts import gTTS
-    except ImportError:
-        print("TTS 라이브러리를 설치하세요: pip install gtts")
+        TextToSpeechEngine = autoclass('android.speech.tts.TextToSpeech$Engine')
+        HashMap = autoclass('java.util.HashMap')
+        Context = autoclass('android.content.Context')
+        PowerManager = autoclass('android.os.PowerManager')
+
+        # TTS 초기화 리스너
+        class TTSInitListener(PythonJavaClass):
+            __javainterfaces__ = ['android.speech.tts.TextToSpeech$OnInitListener']
+            def __init__(self, app):
+                super().__init__()
+                self.app = app
+            @java_method('(I)V')
+            def onInit(self, status):
+                if status == TextToSpeech.SUCCESS:
+                    logging.debug("TTS 초기화 성공")
+                else:
+                    logging.error(f"TTS 초기화 실패: 상태 코드 {status}")
+                self.app.on_android_tts_init(status == TextToSpeech.SUCCESS)
+
+        # TTS 발화 완료 리스너
+        # UtteranceProgressListener는 추상 클래스라 pyjnius로 구현할 수 없어 OnUtteranceCompletedListener 인터페이스를 사용
+        class TTSUtteranceListener(PythonJavaClass):
+            __javainterfaces__ = ['android.speech.tts.TextToSpeech$OnUtteranceCompletedListener']
+            def __init__(self, app):
+                super().__init__()
+                self.app = app
+            @java_method('(Ljava/lang/String;)V')
+            def onUtteranceCompleted(self, utterance_id):
+                if self.app.tts_player:
+                    self.app.tts_player.on_utterance_done(utterance_id)
+
+        android_classes_loaded = True
+
+class StartupTimer:
+    """시작 단계별 경과 시간을 모아서 첫 화면을 그린 뒤 한 번 기록"""
+    def __init__(self, start=STARTUP_CLOCK):
+        self.start = start
+        self.marks = []
+
+    def mark(self, stage):
+        self.marks.append((stage, time.perf_counter() - self.start))
+
+    def report(self):
+        text = ', '.join(f"{stage} {elapsed:.3f}초" for stage, elapsed in self.marks)
+        logging.info(f"시작 시간: {text}")
+        return text
 
 def get_app_directory():
     if platform == 'android':
@@ -94,21 +183,6 @@ def setup_fonts(app_instance=None):
         print(f"폰트 설정 오류: {e}")
         return False
 
-# TTS 초기화 리스너
-class TTSInitListener(PythonJavaClass):
-    __javainterfaces__ = ['android.speech.tts.TextToSpeech$OnInitListener']
-    def __init__(self, app):
-        super().__init__()
-        self.app = app
-    @java_method('(I)V')
-    def onInit(self, status):
-        if status == TextToSpeech.SUCCESS:
-            logging.debug("TTS 초기화 성공")
-            self.app.tts_initialized = True
-        else:
-            logging.error(f"TTS 초기화 실패: 상태 코드 {status}")
-            self.app.tts_initialized = False
-
 def get_app_directory():
     if platform == 'android':
         app = App.get_running_app()
@@ -151,33 +225,1962 @@ def ensure_kivy_config_dir():
     except Exception as e:
         logging.error(f"Kivy 디렉토리 설정 오류: {e}")
 
+VOICE_OPTIONS = {
+    "ko-KR": ["ko-KR-Neural2-A", "ko-KR-Neural2-B", "ko-KR-Neural2-C"],
+    "en-US": ["en-US-Neural2-A", "en-US-Standard-B", "en-US-Neural2-C"],
+    "fr-FR": ["fr-FR-Standard-A", "fr-FR-Standard-B", "fr-FR-Standard-C"],
+    "es-ES": ["es-ES-Standard-A", "es-ES-Standard-B"],
+    "de-DE": ["de-DE-Standard-A", "de-DE-Standard-B"]
+}
+# settings.json의 언어 값 -> TTS 언어 코드
+DECK_LANGUAGE_CODES = {'en': 'en-US', 'fr': 'fr-FR', 'es': 'es-ES', 'de': 'de-DE', 'ko': 'ko-KR'}
+
+# 합성된 TTS 오디오 캐시 설정
+TTS_CACHE_DIR_NAME = 'tts_cache'
+DECK_AUDIO_DIR_NAME = 'audio'  # 단어장별 오프라인 오디오 (크기 제한 없음)
+TTS_CACHE_MAX_BYTES = 100 * 1024 * 1024
+AUDIO_FILE_EXTENSIONS = {'MP3': '.mp3', 'OGG_OPUS': '.ogg', 'LINEAR16': '.wav'}
+
+class AudioCache:
+    """(텍스트, 언어 코드, 음성 이름, 인코딩)을 키로 하는 디스크 오디오 캐시 (크기 제한 LRU)"""
+    def __init__(self, cache_dir, max_bytes=TTS_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # 파일 이름 -> 크기 (오래 사용하지 않은 순서)
+        self.total_bytes = 0
+        self.scanned = False
+        self.scan_lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(text, language, voice, encoding='MP3'):
+        raw = '\x1f'.join([text, language or '', voice or '', encoding])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def file_name(self, text, language, voice, encoding='MP3'):
+        return self.make_key(text, language, voice, encoding) + AUDIO_FILE_EXTENSIONS.get(encoding, '.bin')
+
+    def scan(self):
+        # 파일 수정 시간을 마지막 사용 시간으로 보고 LRU 순서를 복원
+        files = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and not entry.name.endswith('.tmp'):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name, stat.st_size))
+        files.sort()
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+            for _, name, size in files:
+                self.entries[name] = size
+                self.total_bytes += size
+            self.scanned = True
+        logging.debug(f"TTS 캐시 로드: {len(files)}개, {self.total_bytes} 바이트")
+
+    def ensure_scanned(self):
+        # 디렉터리 탐색은 첫 조회 때 한 번만 수행 (앱 시작과 덱 열기를 막지 않도록)
+        if self.scanned:
+            return
+        with self.scan_lock:
+            if not self.scanned:
+                self.scan()
+
+    def get(self, text, language, voice, encoding='MP3'):
+        name = self.file_name(text, language, voice, encoding)
+        path = os.path.join(self.cache_dir, name)
+        self.ensure_scanned()
+        with self.lock:
+            if name not in self.entries:
+                return None
+            if not os.path.exists(path):
+                self.total_bytes -= self.entries.pop(name)
+                return None
+            self.entries.move_to_end(name)
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return path
+
+    def put(self, text, language, voice, data, encoding='MP3'):
+        name = self.file_name(text, language, voice, encoding)
+        path = os.path.join(self.cache_dir, name)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        self.ensure_scanned()
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        with self.lock:
+            if name in self.entries:
+                self.total_bytes -= self.entries.pop(name)
+            self.entries[name] = len(data)
+            self.total_bytes += len(data)
+            self.evict()
+        return path
+
+    def evict(self):
+        # 방금 추가한 항목은 남기고 가장 오래된 항목부터 삭제
+        while self.max_bytes is not None and self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            name, size = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                os.unlink(os.path.join(self.cache_dir, name))
+            except OSError as e:
+                logging.error(f"TTS 캐시 삭제 오류: {e}")
+
+# 이번 실행 동안 메모리에 올려 둘 재생 가능한 클립 수
+TTS_CLIP_CACHE_SIZE = 32
+
+class ClipCache:
+    """불러온 Kivy Sound 객체를 보관하는 메모리 LRU 캐시 (다시 재생할 때 파일을 읽지 않음)"""
+    def __init__(self, max_clips=TTS_CLIP_CACHE_SIZE):
+        self.max_clips = max_clips
+        self.lock = threading.Lock()
+        self.clips = OrderedDict()
+
+    def get(self, key):
+        with self.lock:
+            sound = self.clips.get(key)
+            if sound is not None:
+                self.clips.move_to_end(key)
+            return sound
+
+    def put(self, key, sound):
+        with self.lock:
+            self.clips[key] = sound
+            self.clips.move_to_end(key)
+            while len(self.clips) > self.max_clips:
+                _, old_sound = self.clips.popitem(last=False)
+                old_sound.stop()
+                old_sound.unload()
+
+    def clear(self):
+        with self.lock:
+            for sound in self.clips.values():
+                sound.stop()
+                sound.unload()
+            self.clips.clear()
+
+def tts_cache_voice(voice, tts_client):
+    # gTTS는 음성 선택을 지원하지 않으므로 캐시 키에서 음성을 구분하지 않음
+    return voice if tts_client else 'gtts'
+
+def synthesize_audio(text, language, voice, tts_client=None):
+    """Google Cloud TTS 또는 gTTS로 MP3 오디오 데이터를 합성"""
+    if tts_client:
+        synthesis_input = texttospeech.SynthesisInput(text=text)
+        voice_params = texttospeech.VoiceSelectionParams(language_code=language, name=voice)
+        audio_config = texttospeech.AudioConfig(audio_encoding=texttospeech.AudioEncoding.MP3)
+        response = tts_client.synthesize_speech(input=synthesis_input, voice=voice_params, audio_config=audio_config)
+        return response.audio_content
+    tts = load_gtts()(text=text, lang=language[:2])
+    buffer = io.BytesIO()
+    tts.write_to_fp(buffer)
+    return buffer.getvalue()
+
+# 학습 중 미리 합성할 다음 카드 수와 작업 스레드 수
+TTS_PREFETCH_AHEAD = 3
+TTS_PREFETCH_WORKERS = 2
+
+def synthesize_ssml_sequence(utterances, break_ms, tts_client):
+    """여러 (텍스트, 언어, 음성)을 <break>로 이은 SSML 한 번의 요청으로 합성"""
+    parts = []
+    for i, (text, language, voice) in enumerate(utterances):
+        if i:
+            parts.append(f'<break time="{break_ms}ms"/>')
+        parts.append(f'<voice name={quoteattr(voice)}>{escape(text)}</voice>')
+    ssml = '<speak>' + ''.join(parts) + '</speak>'
+    _, language, voice = utterances[0]
+    synthesis_input = texttospeech.SynthesisInput(ssml=ssml)
+    voice_params = texttospeech.VoiceSelectionParams(language_code=language, name=voice)
+    audio_config = texttospeech.AudioConfig(audio_encoding=texttospeech.AudioEncoding.MP3)
+    response = tts_client.synthesize_speech(input=synthesis_input, voice=voice_params, audio_config=audio_config)
+    return response.audio_content
+
+class TTSPrefetcher:
+    """다음에 볼 카드의 음성을 백그라운드에서 미리 합성해 오디오 캐시에 넣어 둔다"""
+    def __init__(self, app, max_workers=TTS_PREFETCH_WORKERS):
+        self.app = app
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='tts-prefetch')
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.futures = []
+
+    def schedule(self, utterances):
+        # 이전 예약은 취소하고 (텍스트, 언어, 음성) 목록을 가까운 카드부터 순서대로 예약
+        with self.lock:
+            self.generation += 1
+            for future in self.futures:
+                future.cancel()
+            self.futures = [self.executor.submit(self.prefetch, self.generation, text, language, voice)
+                            for text, language, voice in utterances]
+
+    def cancel(self):
+        with self.lock:
+            self.generation += 1
+            for future in self.futures:
+                future.cancel()
+            self.futures = []
+
+    def prefetch(self, generation, text, language, voice):
+        if generation != self.generation:
+            return
+        try:
+            self.app.get_tts_audio(text, language, voice)
+        except Exception as e:
+            logging.error(f"TTS 미리 합성 오류: {e}")
+
+    def shutdown(self):
+        self.cancel()
+        self.executor.shutdown(wait=False)
+
+# 단어와 의미를 이어서 읽을 때 사이의 쉬는 시간 (초)
+TTS_SEQUENCE_PAUSE = 0.4
+# 완료 알림이 오지 않을 때를 대비한 발화당 최대 대기 시간 (초)
+TTS_UTTERANCE_TIMEOUT = 30
+# 안드로이드 TTS 엔진의 onInit을 기다리는 최대 시간 (그동안 요청은 재생 대기열에 쌓임)
+TTS_INIT_TIMEOUT = 5
+
+class TTSPlayer:
+    """모든 화면이 공유하는 단일 TTS 재생 스레드.
+
+    새 요청은 진행 중인 재생을 선점하고, 진행 중이거나 대기 중인 요청과 같은 요청은 무시한다.
+    안드로이드 TTS 엔진이 준비되기 전의 요청은 대기열에 두었다가 준비되면 이어서 재생한다.
+    """
+    def __init__(self, app):
+        self.app = app
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.ready = threading.Event()  # 재생 엔진 준비 완료 (안드로이드 TTS 엔진만 기다림)
+        if platform != 'android':
+            self.ready.set()
+        self.generation = 0
+        self.current_request = None
+        self.stop_event = threading.Event()
+        self.utterance_done = threading.Event()
+        self.utterance_id = None
+        self.utterance_count = 0
+        self.thread = threading.Thread(target=self.run, name='tts-player', daemon=True)
+        self.thread.start()
+
+    def play(self, utterances, pause=TTS_SEQUENCE_PAUSE, combine=False, on_utterance=None, on_complete=None):
+        # utterances: 순서대로 읽을 (텍스트, 언어, 음성) 목록
+        # combine: 여러 발화를 한 번에 합성해 하나의 클립으로 재생 (Google Cloud TTS만 해당.
+        #          gTTS는 발화별 음성을 미리 동시에 합성해 두고 pause를 두고 차례로 재생)
+        # on_utterance(i): i번째 발화 시작 직전, on_complete(): 선점되지 않고 끝났을 때 (재생 스레드에서 호출)
+        request = tuple(utterances)
+        with self.lock:
+            if request == self.current_request:
+                return
+            self.generation += 1
+            self.current_request = request
+            self.stop_event.set()
+            self.utterance_done.set()
+            self.queue.put((self.generation, request, pause, combine, on_utterance, on_complete))
+
+    def is_busy(self):
+        return self.current_request is not None
+
+    def mark_ready(self):
+        # 엔진 초기화가 끝나면(실패해도) 대기열에 쌓인 요청을 이어서 처리
+        self.ready.set()
+
+    def uses_android_engine(self):
+        return platform == 'android' and self.app.tts_engine is not None and self.app.tts_initialized
+
+    def wait_until_ready(self):
+        if self.ready.is_set():
+            return
+        logging.debug("TTS 엔진 준비 대기")
+        if not self.ready.wait(TTS_INIT_TIMEOUT):
+            logging.error("TTS 초기화 시간 초과")
+            self.ready.set()
+
+    def stop(self):
+        with self.lock:
+            self.generation += 1
+            self.current_request = None
+            self.stop_event.set()
+            self.utterance_done.set()
+
+    def on_utterance_done(self, utterance_id):
+        # Kivy Sound.on_stop 또는 안드로이드 발화 완료 리스너에서 호출
+        if utterance_id == self.utterance_id:
+            self.utterance_done.set()
+
+    def shutdown(self):
+        self.stop()
+        self.queue.put(None)
+        self.thread.join(timeout=2)
+
+    def run(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                break
+            self.wait_until_ready()
+            generation, request, pause, combine, on_utterance, on_complete = job
+            with self.lock:
+                if generation != self.generation:
+                    continue  # 더 새로운 요청이 들어와 있음
+                self.stop_event.clear()
+            if combine and len(request) > 1 and self.app.tts_client and not self.uses_android_engine():
+                self.play_clip(lambda: self.app.get_tts_combined_sound(request, pause))
+            else:
+                if combine and len(request) > 1 and not self.uses_android_engine():
+                    self.app.tts_prefetcher.schedule(request[1:])
+                for i, (text, language, voice) in enumerate(request):
+                    if i and self.stop_event.wait(pause):
+                        break
+                    if self.stop_event.is_set():
+                        break
+                    if on_utterance:
+                        self.run_callback(on_utterance, i)
+                    self.speak(text, language, voice)
+            with self.lock:
+                finished = generation == self.generation and not self.stop_event.is_set()
+                if generation == self.generation:
+                    self.current_request = None
+            if finished and on_complete:
+                self.run_callback(on_complete)
+
+    def run_callback(self, callback, *args):
+        try:
+            callback(*args)
+        except Exception as e:
+            logging.error(f"TTS 콜백 오류: {e}")
+
+    def speak(self, text, language, voice):
+        app = self.app
+        if not self.uses_android_engine():
+            self.play_clip(lambda: app.get_tts_sound(text, language, voice))
+            return
+        utterance_id = self.next_utterance_id()
+        try:
+            if not self.start_utterance(utterance_id):
+                return
+            params = HashMap()
+            params.put(TextToSpeechEngine.KEY_PARAM_UTTERANCE_ID, utterance_id)
+            app.tts_engine.setLanguage(Locale(*language.split('-')))
+            app.tts_engine.speak(text, TextToSpeech.QUEUE_FLUSH, params)
+            self.utterance_done.wait(TTS_UTTERANCE_TIMEOUT)
+            if self.stop_event.is_set():
+                app.tts_engine.stop()
+        except Exception as e:
+            print(f"TTS 재생 오류: {e}")
+        finally:
+            self.utterance_id = None
+
+    def play_clip(self, load_sound):
+        # load_sound: 합성/캐시 조회 후 Kivy Sound를 반환하는 함수
+        sound = None
+        utterance_id = self.next_utterance_id()
+        try:
+            sound = load_sound()
+            if sound and self.start_utterance(utterance_id):
+                callback_uid = sound.fbind('on_stop', lambda *args: self.on_utterance_done(utterance_id))
+                try:
+                    sound.play()
+                    self.utterance_done.wait(TTS_UTTERANCE_TIMEOUT)
+                finally:
+                    sound.unbind_uid('on_stop', callback_uid)
+        except Exception as e:
+            print(f"TTS 재생 오류: {e}")
+        finally:
+            self.utterance_id = None
+            if sound:
+                sound.stop()
+
+    def next_utterance_id(self):
+        self.utterance_count += 1
+        return f"utterance-{self.utterance_count}"
+
+    def start_utterance(self, utterance_id):
+        # 선점된 상태면 시작하지 않음
+        with self.lock:
+            if self.stop_event.is_set():
+                return False
+            self.utterance_id = utterance_id
+            self.utterance_done.clear()
+            return True
+
+# 페이지 단위로 카드를 읽을 때 한 페이지의 카드 수와 메모리에 둘 페이지 수
+CARD_PAGE_SIZE = 200
+CARD_PAGE_CACHE_SIZE = 8
+
+class ListCardSource(list):
+    """메모리에 모두 올린 카드 목록 (PagedCardSource와 같은 접근 방식 제공)"""
+    def window(self, start, stop):
+        for index in range(max(start, 0), min(stop, len(self))):
+            yield self[index]
+
+class PagedCardSource:
+    """저장소에서 필요한 페이지만 읽어 오는 카드 목록.
+
+    len(), 인덱스 접근, 구간 순회를 지원하고 최근에 쓴 페이지 몇 개만 메모리에 둔다.
+    변경 내용은 FlashcardApp이 저장소에 기록하고, 여기서는 개수와 캐시만 맞춘다.
+    """
+    def __init__(self, store, page_size=CARD_PAGE_SIZE, max_pages=CARD_PAGE_CACHE_SIZE):
+        self.store = store
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.length = store.count()
+        self.pages = OrderedDict()
+        self.lock = threading.Lock()
+        # 페이지를 새로 읽기 전에 호출 (아직 기록되지 않은 변경을 저장소에 먼저 반영)
+        self.sync = None
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError('card index out of range')
+        page = self.page(index // self.page_size)
+        return page[index % self.page_size]
+
+    def __iter__(self):
+        return self.window(0, self.length)
+
+    def window(self, start, stop):
+        index = max(start, 0)
+        stop = min(stop, self.length)
+        while index < stop:
+            page_number, offset = divmod(index, self.page_size)
+            page = self.page(page_number)
+            count = min(len(page) - offset, stop - index)
+            if count <= 0:
+                break
+            yield from page[offset:offset + count]
+            index += count
+
+    def page(self, page_number):
+        with self.lock:
+            page = self.pages.get(page_number)
+            if page is not None:
+                self.pages.move_to_end(page_number)
+                return page
+        if self.sync:
+            self.sync()
+        page = self.store.read_page(page_number * self.page_size, self.page_size)
+        with self.lock:
+            self.pages[page_number] = page
+            while len(self.pages) > self.max_pages:
+                self.pages.popitem(last=False)
+        return page
+
+    def invalidate_from(self, index):
+        # index가 들어 있는 페이지부터 뒤쪽 페이지는 다시 읽어야 함
+        first_page = index // self.page_size
+        with self.lock:
+            for page_number in [p for p in self.pages if p >= first_page]:
+                del self.pages[page_number]
+
+    def extend(self, cards):
+        self.invalidate_from(self.length)
+        self.length += len(cards)
+
+    def append(self, card):
+        self.extend([card])
+
+    def pop(self, index):
+        # 삭제할 카드를 읽으려고 페이지를 불러오지 않음 (반환값 없음)
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError('card index out of range')
+        self.invalidate_from(index)
+        self.length -= 1
+
+# 단어장 저장: flashcards.json 스냅샷 + 변경 기록 저널
+DECK_SNAPSHOT_NAME = 'flashcards.json'
+DECK_JOURNAL_NAME = 'flashcards.journal'
+DECK_COMPACT_THRESHOLD = 500  # 저널 기록이 이만큼 쌓이면 스냅샷으로 합침
+
+def write_file_atomic(path, data):
+    """임시 파일에 쓰고 교체해서, 쓰는 도중 중단되어도 기존 파일이 깨지지 않게 함"""
+    temp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+# 중복 확인용 카드 해시 색인 (flashcards.json 옆에 저장)
+DECK_INDEX_NAME = 'flashcards.index.json'
+CARD_KEY_SPACE_PATTERN = re.compile(r'\s+')
+
+def normalize_card_text(text):
+    # 대소문자, 유니코드 표기, 연속 공백 차이는 같은 카드로 봄
+    return CARD_KEY_SPACE_PATTERN.sub(' ', unicodedata.normalize('NFKC', text)).strip().casefold()
+
+def card_key(card):
+    text = normalize_card_text(card['front']) + '\x1f' + normalize_card_text(card['back'])
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+class CardIndex:
+    """정규화한 (앞면, 뒷면) 해시별 카드 수. 카드를 추가/수정/삭제할 때마다 함께 갱신한다."""
+    def __init__(self, counts=None):
+        self.counts = counts or {}
+
+    @classmethod
+    def build(cls, cards):
+        index = cls()
+        for card in cards:
+            index.add(card)
+        return index
+
+    @classmethod
+    def read(cls, path, base):
+        # 저장된 색인이 없거나 다른 스냅샷의 색인이면 None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get('base') != base:
+            return None
+        return cls(data.get('keys') or {})
+
+    def write(self, path, base):
+        data = json.dumps({'base': base, 'keys': self.counts}, separators=(',', ':'))
+        write_file_atomic(path, data.encode('utf-8'))
+
+    def add(self, card):
+        key = card_key(card)
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+    def remove(self, card):
+        key = card_key(card)
+        count = self.counts.get(key, 0) - 1
+        if count > 0:
+            self.counts[key] = count
+        else:
+            self.counts.pop(key, None)
+
+    def remove_at(self, cards, index):
+        self.remove(cards[index])
+
+    def contains(self, card):
+        return card_key(card) in self.counts
+
+# 스냅샷 형식: 'json' (flashcards.json) 또는 'binary' (flashcards.bin, 큰 단어장을 빨리 열고 메모리를 덜 씀)
+DECK_SNAPSHOT_FORMAT = 'json'
+DECK_BINARY_SNAPSHOT_NAME = 'flashcards.bin'
+BINARY_SNAPSHOT_MAGIC = b'FCB1'
+BINARY_HEADER = struct.Struct('<4sI')  # 매직, 카드 수
+
+class DeckFormatError(ValueError):
+    pass
+
+class CardRecord:
+    """카드 한 장. dict처럼 card['front'], card.get(), card.update()로 쓰지만 __slots__로 카드당 메모리를 줄임"""
+    __slots__ = ('front', 'back', 'starred', 'extra')
+    FIELDS = ('front', 'back', 'starred')
+
+    def __init__(self, front, back, starred=False, extra=None):
+        self.front = front
+        self.back = back
+        self.starred = starred
+        self.extra = extra  # 앞면/뒷면/별표 외의 항목 (없으면 None)
+
+    @classmethod
+    def from_dict(cls, card):
+        extra = {key: value for key, value in card.items() if key not in cls.FIELDS}
+        return cls(card['front'], card['back'], bool(card.get('starred')), extra or None)
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        return key in self.FIELDS or bool(self.extra and key in self.extra)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return list(self.FIELDS) + (list(self.extra) if self.extra else [])
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def update(self, fields=(), **kwargs):
+        for key, value in dict(fields, **kwargs).items():
+            self[key] = value
+
+    def to_dict(self):
+        return dict(self.items())
+
+def card_json_default(value):
+    # json.dumps(default=...)용: CardRecord를 dict로 바꿔서 저장
+    if isinstance(value, CardRecord):
+        return value.to_dict()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def encode_binary_snapshot(cards):
+    """카드 목록을 바이너리 스냅샷으로 변환.
+
+    [매직, 카드 수][별표 (카드마다 1바이트)] 다음에 앞면, 뒷면, 기타 항목(JSON) 열마다
+    [바이트 위치 (카드 수 + 1)개][글자 위치 (카드 수 + 1)개][UTF-8 문자열 표]가 이어진다.
+    위치 색인이 있어서 mmap으로 연 뒤 아무 카드나 바로 읽을 수 있고, 전체를 읽을 때는 열마다 한 번에 디코딩한다.
+    """
+    starred = bytes(1 if card.get('starred') else 0 for card in cards)
+    columns = [[], [], []]
+    for card in cards:
+        extra = {key: value for key, value in card.items() if key not in CardRecord.FIELDS}
+        columns[0].append(card['front'])
+        columns[1].append(card['back'])
+        columns[2].append(json.dumps(extra, ensure_ascii=False) if extra else '')
+    parts = [BINARY_HEADER.pack(BINARY_SNAPSHOT_MAGIC, len(cards)), starred]
+    for texts in columns:
+        encoded = [text.encode('utf-8') for text in texts]
+        parts.append(struct.pack(f'<{len(cards) + 1}I', 0, *itertools.accumulate(len(data) for data in encoded)))
+        parts.append(struct.pack(f'<{len(cards) + 1}I', 0, *itertools.accumulate(len(text) for text in texts)))
+        parts.extend(encoded)
+    return b''.join(parts)
+
+class BinarySnapshot:
+    """mmap으로 연 바이너리 스냅샷. 인덱스로 카드 하나만 읽거나 cards()로 전체를 CardRecord 목록으로 읽음"""
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            try:
+                self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise DeckFormatError("빈 스냅샷 파일입니다.")
+        try:
+            self.parse()
+        except struct.error:
+            self.data.close()
+            raise DeckFormatError("스냅샷 파일이 잘렸습니다.")
+
+    def parse(self):
+        magic, self.count = BINARY_HEADER.unpack_from(self.data, 0)
+        if magic != BINARY_SNAPSHOT_MAGIC:
+            raise DeckFormatError("스냅샷 파일 형식이 아닙니다.")
+        pos = BINARY_HEADER.size
+        self.starred_start = pos
+        pos += self.count
+        offsets_format = struct.Struct(f'<{self.count + 1}I')
+        self.columns = []  # (바이트 위치, 글자 위치, 문자열 표 시작)
+        for _ in range(3):
+            byte_offsets = offsets_format.unpack_from(self.data, pos)
+            char_offsets = offsets_format.unpack_from(self.data, pos + offsets_format.size)
+            pos += 2 * offsets_format.size
+            self.columns.append((byte_offsets, char_offsets, pos))
+            pos += byte_offsets[-1]
+        if pos != len(self.data):
+            raise struct.error('size mismatch')
+
+    def __len__(self):
+        return self.count
+
+    def text(self, column, index):
+        byte_offsets, _, start = self.columns[column]
+        return self.data[start + byte_offsets[index]:start + byte_offsets[index + 1]].decode('utf-8')
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError('card index out of range')
+        extra = self.text(2, index)
+        return CardRecord(self.text(0, index), self.text(1, index), self.data[self.starred_start + index] == 1,
+                          json.loads(extra) if extra else None)
+
+    def column_texts(self, column):
+        byte_offsets, char_offsets, start = self.columns[column]
+        text = self.data[start:start + byte_offsets[-1]].decode('utf-8')
+        return [text[char_offsets[i]:char_offsets[i + 1]] for i in range(self.count)]
+
+    def cards(self):
+        starred = bytearray(self.data[self.starred_start:self.starred_start + self.count])
+        return BinaryCardList(self.column_texts(0), self.column_texts(1), starred, self.column_texts(2))
+
+    def hexdigest(self):
+        return hashlib.sha1(self.data).hexdigest()
+
+    def close(self):
+        self.data.close()
+
+class BinaryCardList:
+    """바이너리 스냅샷에서 열 단위로 읽어 둔 카드 목록 (ListCardSource와 같은 방식으로 사용).
+
+    카드마다 객체를 만들지 않고 문자열 열만 들고 있다가, 카드를 처음 꺼낼 때 CardRecord를 만들어 둔다.
+    """
+    def __init__(self, fronts, backs, starred, extras):
+        self.fronts = fronts
+        self.backs = backs
+        self.starred = starred
+        self.extras = extras
+        self.records = [None] * len(fronts)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        record = self.records[index]
+        if record is None:
+            extra = self.extras[index]
+            record = CardRecord(self.fronts[index], self.backs[index], self.starred[index] == 1,
+                                json.loads(extra) if extra else None)
+            self.records[index] = record
+        return record
+
+    def __setitem__(self, index, card):
+        self.records[index] = card
+
+    def __iter__(self):
+        return self.window(0, len(self))
+
+    def window(self, start, stop):
+        for index in range(max(start, 0), min(stop, len(self))):
+            yield self[index]
+
+    def append(self, card):
+        self.fronts.append(None)
+        self.backs.append(None)
+        self.starred.append(0)
+        self.extras.append(None)
+        self.records.append(card)
+
+    def extend(self, cards):
+        for card in cards:
+            self.append(card)
+
+    def pop(self, index):
+        record = self[index]
+        for column in (self.fronts, self.backs, self.starred, self.extras, self.records):
+            del column[index]
+        return record
+
+class DeckStore:
+    """단어장 디렉토리의 카드 저장소.
+
+    변경할 때마다 저널에 한 줄만 추가하고, 기록이 쌓이면 스냅샷을 원자적으로 다시 써서 합친다.
+    저널 첫 줄에는 기준 스냅샷의 해시를 적어 두어, 합치는 도중 중단된 저널을 다시 적용하지 않는다.
+    """
+    def __init__(self, deck_dir):
+        self.deck_dir = deck_dir
+        self.snapshot_path = os.path.join(deck_dir, DECK_SNAPSHOT_NAME)
+        self.journal_path = os.path.join(deck_dir, DECK_JOURNAL_NAME)
+        self.index_path = os.path.join(deck_dir, DECK_INDEX_NAME)
+        self.binary_path = os.path.join(deck_dir, DECK_BINARY_SNAPSHOT_NAME)
+        self.snapshot_hash = None
+        self.journal_records = 0
+        self.index = None
+        self.batched = None
+        self.lock = threading.Lock()
+
+    def binary_is_current(self):
+        # 바이너리 스냅샷이 있고 flashcards.json보다 오래되지 않았으면 (예: 파일 불러오기 전) 그것을 읽음
+        try:
+            binary_mtime = os.stat(self.binary_path).st_mtime_ns
+        except OSError:
+            return False
+        try:
+            return binary_mtime >= os.stat(self.snapshot_path).st_mtime_ns
+        except OSError:
+            return True
+
+    def load(self, repair=False):
+        # 스냅샷이 손상된 경우 ValueError(json.JSONDecodeError 또는 DeckFormatError)를 그대로 올림.
+        # repair: 이 저장소로 기록할 때만 (앱의 지금 단어장) 저널 끝의 잘린 줄을 잘라냄
+        if self.binary_is_current():
+            snapshot = BinarySnapshot(self.binary_path)
+            try:
+                cards = snapshot.cards()
+                self.snapshot_hash = snapshot.hexdigest()
+            finally:
+                snapshot.close()
+            has_snapshot = True
+        else:
+            try:
+                with open(self.snapshot_path, 'rb') as f:
+                    data = f.read()
+                cards = json.loads(data.decode('utf-8'))
+            except FileNotFoundError:
+                data = b''
+                cards = []
+            self.snapshot_hash = hashlib.sha1(data).hexdigest()
+            has_snapshot = bool(data)
+        self.index = CardIndex.read(self.index_path, self.snapshot_hash)
+        if self.index is None:
+            self.index = CardIndex.build(cards)
+            if has_snapshot:
+                try:
+                    self.index.write(self.index_path, self.snapshot_hash)
+                except OSError as e:
+                    logging.warning(f"카드 색인 저장 실패: {e}")
+        self.journal_records = self.replay_journal(cards, repair)
+        return cards
+
+    def open_cards(self, repair=False):
+        cards = self.load(repair)
+        return cards if isinstance(cards, BinaryCardList) else ListCardSource(cards)
+
+    def open_index(self):
+        # load() 이후의 카드 상태(저널 포함)에 맞는 색인
+        if self.index is None:
+            self.load()
+        return self.index
+
+    def replay_journal(self, cards, repair=False):
+        # 읽기만 하는 호출은 첫 번째 잘못된 줄에서 멈추기만 함. 다른 스레드의 저장기가 쓰는 중인 줄일 수 있으므로
+        # 잘라내는 것은 그 단어장에 기록할 저장소만 함
+        try:
+            with open(self.journal_path, 'rb') as f:
+                header = json.loads(f.readline() or b'null')
+                if not header or header.get('base') != self.snapshot_hash:
+                    return 0  # 이미 스냅샷에 합쳐진 저널
+                count = 0
+                valid_size = f.tell()
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    self.apply(cards, record, self.index)
+                    count += 1
+                    valid_size = f.tell()
+        except (FileNotFoundError, ValueError):
+            return 0
+        if repair and valid_size != os.path.getsize(self.journal_path):
+            # 기록하다 중단된 마지막 줄은 잘라내서 이후 기록이 이어지게 함
+            os.truncate(self.journal_path, valid_size)
+        return count
+
+    @staticmethod
+    def apply(cards, record, index=None):
+        op = record['op']
+        if op == 'add':
+            cards.extend(record['cards'])
+            if index is not None:
+                for card in record['cards']:
+                    index.add(card)
+        elif op == 'update':
+            if index is not None:
+                index.remove(cards[record['index']])
+                index.add(record['card'])
+            cards[record['index']] = record['card']
+        elif op == 'delete':
+            if index is not None:
+                index.remove(cards[record['index']])
+            cards.pop(record['index'])
+
+    @contextmanager
+    def batch(self):
+        # 안에서 생기는 변경을 모아 저널에 한 번에 기록 (fsync 한 번)
+        self.batched = []
+        try:
+            yield
+        finally:
+            records, self.batched = self.batched, None
+            if records:
+                self.write_records(records)
+
+    def append(self, record):
+        if self.batched is not None:
+            self.batched.append(record)
+        else:
+            self.write_records([record])
+
+    def write_records(self, records):
+        with self.lock:
+            os.makedirs(self.deck_dir, exist_ok=True)
+            lines = []
+            if self.journal_records == 0:
+                lines.append(json.dumps({'base': self.snapshot_hash}))
+                mode = 'w'
+            else:
+                mode = 'a'
+            lines.extend(json.dumps(record, ensure_ascii=False, default=card_json_default) for record in records)
+            with open(self.journal_path, mode, encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self.journal_records += len(records)
+
+    def add(self, cards):
+        self.append({'op': 'add', 'cards': cards})
+
+    def update(self, index, card):
+        self.append({'op': 'update', 'index': index, 'card': card})
+
+    def delete(self, index):
+        self.append({'op': 'delete', 'index': index})
+
+    def needs_compaction(self):
+        return self.journal_records >= DECK_COMPACT_THRESHOLD
+
+    def compact(self, cards):
+        # 전체 카드를 새 스냅샷으로 쓰고 저널을 비움
+        cards = list(cards)
+        with self.lock:
+            os.makedirs(self.deck_dir, exist_ok=True)
+            if DECK_SNAPSHOT_FORMAT == 'binary':
+                data = encode_binary_snapshot(cards)
+                write_file_atomic(self.binary_path, data)
+            else:
+                data = json.dumps(cards, ensure_ascii=False, indent=2, default=card_json_default).encode('utf-8')
+                write_file_atomic(self.snapshot_path, data)
+                if os.path.exists(self.binary_path):
+                    os.unlink(self.binary_path)
+            self.snapshot_hash = hashlib.sha1(data).hexdigest()
+            if os.path.exists(self.journal_path):
+                os.unlink(self.journal_path)
+            self.journal_records = 0
+            CardIndex.build(cards).write(self.index_path, self.snapshot_hash)
+
+    def drop(self):
+        for path in (self.snapshot_path, self.journal_path, self.index_path, self.binary_path):
+            if os.path.exists(path):
+                os.unlink(path)
+
+# 카드 저장 방식: 'json' (flashcards.json + 저널) 또는 'sqlite' (decks/cards.db)
+DECK_STORAGE_BACKEND = 'json'
+SQLITE_DB_NAME = 'cards.db'
+
+class SqliteDeckStore:
+    """모든 단어장의 카드를 하나의 SQLite 파일에 두는 저장소 (DeckStore와 같은 인터페이스 + 페이지 단위 읽기).
+
+    처음 여는 단어장은 기존 flashcards.json(및 저널)을 가져오고, 파일이 다시 가져오기 등으로 바뀌면 새로 가져온다.
+    position은 순서만 나타내며 삭제한 자리를 당기지 않으므로 중간이 비어 있을 수 있다 (n번째 카드는 position 순서로 n번째 행).
+    """
+    connections = {}
+    connections_lock = threading.Lock()
+    # index번째 카드의 position (인덱스만 훑으므로 뒤쪽 행을 모두 옮기는 것보다 훨씬 빠름)
+    POSITION_AT = '(SELECT position FROM cards WHERE deck = ? ORDER BY position LIMIT 1 OFFSET ?)'
+
+    def __init__(self, db_path, deck, deck_dir=None):
+        self.db_path = db_path
+        self.deck = deck
+        self.deck_dir = deck_dir
+        self.conn, self.lock = self.connect(db_path)
+        self.in_batch = False
+
+    @classmethod
+    def connect(cls, db_path):
+        with cls.connections_lock:
+            if db_path not in cls.connections:
+                conn = sqlite3.connect(db_path, check_same_thread=False)
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.executescript("""
+                    CREATE TABLE IF NOT EXISTS cards (
+                        id INTEGER PRIMARY KEY,
+                        deck TEXT NOT NULL,
+                        position INTEGER NOT NULL,
+                        front TEXT NOT NULL,
+                        back TEXT NOT NULL,
+                        starred INTEGER NOT NULL DEFAULT 0,
+                        extra TEXT,
+                        card_key TEXT
+                    );
+                    CREATE UNIQUE INDEX IF NOT EXISTS idx_cards_deck_position ON cards(deck, position);
+                    CREATE INDEX IF NOT EXISTS idx_cards_deck_starred ON cards(deck, starred);
+                    CREATE INDEX IF NOT EXISTS idx_cards_deck_front ON cards(deck, front);
+                    CREATE TABLE IF NOT EXISTS decks (
+                        deck TEXT PRIMARY KEY,
+                        source_mtime INTEGER
+                    );
+                """)
+                columns = [row[1] for row in conn.execute('PRAGMA table_info(cards)')]
+                if 'card_key' not in columns:
+                    # 색인 열이 없던 데이터베이스: 열을 추가하고 기존 카드의 해시를 채움
+                    conn.execute('ALTER TABLE cards ADD COLUMN card_key TEXT')
+                    rows = conn.execute('SELECT id, front, back FROM cards').fetchall()
+                    conn.executemany('UPDATE cards SET card_key = ? WHERE id = ?',
+                                     [(card_key({'front': front, 'back': back}), row_id) for row_id, front, back in rows])
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_cards_deck_key ON cards(deck, card_key)')
+                conn.commit()
+                cls.connections[db_path] = (conn, threading.Lock())
+            return cls.connections[db_path]
+
+    @staticmethod
+    def to_row(card):
+        extra = {k: v for k, v in card.items() if k not in ('front', 'back', 'starred')}
+        return (card['front'], card['back'], int(bool(card.get('starred'))),
+                json.dumps(extra, ensure_ascii=False) if extra else None, card_key(card))
+
+    @staticmethod
+    def from_row(row):
+        front, back, starred, extra = row
+        card = {'front': front, 'back': back, 'starred': bool(starred)}
+        if extra:
+            card.update(json.loads(extra))
+        return card
+
+    def migrate(self):
+        # flashcards.json이 없거나 이미 가져온 상태면 아무것도 하지 않음
+        if not self.deck_dir:
+            return
+        snapshot_path = os.path.join(self.deck_dir, DECK_SNAPSHOT_NAME)
+        if not os.path.exists(snapshot_path):
+            return
+        source_mtime = os.stat(snapshot_path).st_mtime_ns
+        with self.lock:
+            row = self.conn.execute('SELECT source_mtime FROM decks WHERE deck = ?', (self.deck,)).fetchone()
+        if row and row[0] == source_mtime:
+            return
+        cards = DeckStore(self.deck_dir).load()
+        self.compact(cards)
+        with self.lock, self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO decks (deck, source_mtime) VALUES (?, ?)', (self.deck, source_mtime))
+        logging.debug(f"SQLite로 카드 가져오기: {self.deck} ({len(cards)}개)")
+
+    def load(self):
+        self.migrate()
+        return self.read_page(0, None)
+
+    def open_cards(self, repair=False):
+        # 전체를 읽지 않고 필요한 페이지만 읽는 카드 목록 (SQLite는 트랜잭션으로 기록하므로 repair는 필요 없음)
+        self.migrate()
+        return PagedCardSource(self)
+
+    def open_index(self):
+        return SqliteCardIndex(self)
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM cards WHERE deck = ?', (self.deck,)).fetchone()[0]
+
+    def read_page(self, offset, limit):
+        # position 인덱스 순서로 offset번째부터 limit개 (limit이 None이면 끝까지)
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT front, back, starred, extra FROM cards WHERE deck = ? ORDER BY position LIMIT ? OFFSET ?',
+                (self.deck, -1 if limit is None else limit, offset)).fetchall()
+        return [self.from_row(row) for row in rows]
+
+    @contextmanager
+    def batch(self):
+        # 안에서 생기는 변경을 하나의 트랜잭션으로 커밋
+        with self.lock, self.conn:
+            self.in_batch = True
+            try:
+                yield
+            finally:
+                self.in_batch = False
+
+    @contextmanager
+    def transaction(self):
+        if self.in_batch:
+            yield  # batch()가 이미 잠금과 트랜잭션을 잡고 있음
+            return
+        with self.lock, self.conn:
+            yield
+
+    def add(self, cards):
+        with self.transaction():
+            start = self.conn.execute('SELECT COALESCE(MAX(position) + 1, 0) FROM cards WHERE deck = ?', (self.deck,)).fetchone()[0]
+            self.conn.executemany(
+                'INSERT INTO cards (deck, position, front, back, starred, extra, card_key) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(self.deck, start + i) + self.to_row(card) for i, card in enumerate(cards)])
+
+    def update(self, index, card):
+        with self.transaction():
+            self.conn.execute('UPDATE cards SET front = ?, back = ?, starred = ?, extra = ?, card_key = ? WHERE deck = ? AND position = '
+                              + self.POSITION_AT, self.to_row(card) + (self.deck, self.deck, index))
+
+    def delete(self, index):
+        with self.transaction():
+            # 뒤쪽 카드의 position은 그대로 둠 (번호를 당기면 큰 단어장에서 삭제 한 번에 모든 행을 다시 씀)
+            self.conn.execute('DELETE FROM cards WHERE deck = ? AND position = ' + self.POSITION_AT,
+                              (self.deck, self.deck, index))
+
+    def needs_compaction(self):
+        return False
+
+    def compact(self, cards):
+        # 단어장의 카드를 주어진 목록으로 통째로 교체 (cards가 이 저장소를 읽는 목록일 수 있으므로 먼저 모두 읽음)
+        rows = [(self.deck, i) + self.to_row(card) for i, card in enumerate(cards)]
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM cards WHERE deck = ?', (self.deck,))
+            self.conn.executemany(
+                'INSERT INTO cards (deck, position, front, back, starred, extra, card_key) VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+
+    def drop(self):
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM cards WHERE deck = ?', (self.deck,))
+            self.conn.execute('DELETE FROM decks WHERE deck = ?', (self.deck,))
+
+class SqliteCardIndex:
+    """SqliteDeckStore의 card_key 열 색인으로 중복을 확인 (저장소가 쓸 때 함께 갱신되므로 add/remove는 할 일 없음)"""
+    def __init__(self, store):
+        self.store = store
+        # 확인하기 전에 호출 (아직 기록되지 않은 변경을 저장소에 먼저 반영)
+        self.sync = None
+
+    def add(self, card):
+        pass
+
+    def remove(self, card):
+        pass
+
+    def remove_at(self, cards, index):
+        pass
+
+    def contains(self, card):
+        if self.sync:
+            self.sync()
+        store = self.store
+        with store.lock:
+            row = store.conn.execute('SELECT 1 FROM cards WHERE deck = ? AND card_key = ? LIMIT 1',
+                                     (store.deck, card_key(card))).fetchone()
+        return row is not None
+
+def open_deck_store(deck_dir):
+    """decks/<제목>/<단어장> 디렉토리에 대해 설정된 저장 방식의 저장소를 반환"""
+    if DECK_STORAGE_BACKEND == 'sqlite':
+        decks_dir = os.path.dirname(os.path.dirname(os.path.abspath(deck_dir)))
+        deck = os.path.relpath(os.path.abspath(deck_dir), decks_dir).replace(os.sep, '/')
+        return SqliteDeckStore(os.path.join(decks_dir, SQLITE_DB_NAME), deck, deck_dir)
+    return DeckStore(deck_dir)
+
+# 카드 변경을 모아서 기록할 때까지 기다리는 시간 (초)
+DECK_SAVE_DELAY = 0.5
+
+class DeckSaver:
+    """카드 변경을 잠시 모았다가 백그라운드 스레드에서 한 번에 기록하는 저장기.
+
+    변경은 바로 메모리의 카드 목록에 반영하고, 저장소 기록은 DECK_SAVE_DELAY 동안 모아서 한 번에 쓴다.
+    앱이 일시정지되거나 종료될 때, 단어장을 바꿀 때는 flush()로 남은 변경을 바로 기록한다.
+    on_saved(단어장 경로, 카드 목록)는 기록한 단어장 기준으로 호출된다 (그 사이 앱의 현재 단어장이 바뀌었을 수 있음).
+    """
+    def __init__(self, on_error=None, on_saved=None, delay=DECK_SAVE_DELAY):
+        self.on_error = on_error
+        self.on_saved = on_saved
+        self.delay = delay
+        self.lock = threading.RLock()  # store, cards, pending, timer 보호
+        self.write_lock = threading.RLock()  # 기록은 한 번에 하나씩
+        self.store = None
+        self.cards = None
+        self.deck_path = None
+        self.pending = []
+        self.timer = None
+
+    def attach(self, store, cards, deck_path=None):
+        # 다른 단어장으로 바꾸기 전에 이전 단어장의 변경을 모두 기록
+        with self.write_lock:
+            self.flush()
+            with self.lock:
+                self.store = store
+                self.cards = cards
+                self.deck_path = deck_path
+
+    def record(self, change, write):
+        # change는 메모리의 카드 목록을, write는 저장소를 같은 방식으로 바꿈
+        with self.lock:
+            change()
+            if self.store is None:
+                return
+            self.pending.append(write)
+            if self.timer is None:
+                self.timer = threading.Timer(self.delay, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        # 모인 변경을 호출한 스레드에서 바로 기록하고, 저널이 쌓였으면 스냅샷으로 합침
+        with self.write_lock:
+            with self.lock:
+                if self.timer is not None:
+                    self.timer.cancel()
+                    self.timer = None
+                store, cards, deck_path = self.store, self.cards, self.deck_path
+                writes, self.pending = self.pending, []
+            if store is None or not writes:
+                return
+            try:
+                with store.batch():
+                    for write in writes:
+                        write(store)
+                snapshot = None
+                with self.lock:
+                    # 기록 대기 중인 변경이 없을 때만 메모리의 카드 목록이 저장소와 같은 상태
+                    if not self.pending and store.needs_compaction():
+                        snapshot = [dict(card) for card in cards]
+                if snapshot is not None:
+                    store.compact(snapshot)
+                if self.on_saved:
+                    self.on_saved(deck_path, cards)
+            except Exception as e:
+                logging.error(f"카드 저장 실패: {e}")
+                if self.on_error:
+                    self.on_error(e)
+
+# 단어장 목록 파일 (decks 디렉토리 안)
+DECK_CATALOG_NAME = 'catalog.json'
+
+class DeckCatalog:
+    """모든 단어장의 목록과 카드 수, 언어, 마지막 학습 시각을 파일 하나에 보관.
+
+    단어장 선택 화면은 이 파일만 읽고, 단어장을 만들거나 불러오거나 지울 때 함께 갱신한다.
+    파일이 없거나 손상되었으면 decks 디렉토리를 한 번 훑어서 다시 만든다.
+    """
+    def __init__(self, decks_dir):
+        self.decks_dir = decks_dir
+        self.path = os.path.join(decks_dir, DECK_CATALOG_NAME)
+        self.lock = threading.RLock()
+        self.titles = None
+
+    def load(self):
+        with self.lock:
+            if self.titles is None:
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        titles = json.load(f)['titles']
+                    if not isinstance(titles, dict):
+                        raise ValueError('titles')
+                    self.titles = titles
+                except (OSError, ValueError, KeyError, TypeError):
+                    self.rebuild()
+            return self.titles
+
+    def rebuild(self):
+        titles = {}
+        if os.path.isdir(self.decks_dir):
+            for title_name in sorted(os.listdir(self.decks_dir)):
+                title_dir = os.path.join(self.decks_dir, title_name)
+                if not os.path.isdir(title_dir):
+                    continue
+                titles[title_name] = {}
+                for deck_name in sorted(os.listdir(title_dir)):
+                    deck_dir = os.path.join(title_dir, deck_name)
+                    if os.path.isdir(deck_dir):
+                        titles[title_name][deck_name] = dict(self.new_entry(), **self.scan_deck(deck_dir))
+        with self.lock:
+            self.titles = titles
+            self.save()
+        logging.debug(f"단어장 목록 다시 만들기: {len(titles)}개 제목")
+
+    @staticmethod
+    def new_entry():
+        return {'cards': 0, 'front_lang': None, 'back_lang': None, 'last_studied': None}
+
+    @staticmethod
+    def scan_deck(deck_dir):
+        # 단어장 디렉토리에서 카드 수와 언어 설정을 읽음 (목록을 새로 만들거나 파일을 불러온 뒤에만 사용)
+        entry = {}
+        try:
+            with open(os.path.join(deck_dir, 'settings.json'), 'r', encoding='utf-8') as f:
+                settings = json.load(f)
+            entry['front_lang'] = settings.get('front_lang')
+            entry['back_lang'] = settings.get('back_lang')
+        except (OSError, ValueError, AttributeError):
+            pass
+        try:
+            entry['cards'] = len(open_deck_store(deck_dir).open_cards())
+        except (OSError, ValueError):
+            pass
+        return entry
+
+    def save(self):
+        with self.lock:
+            os.makedirs(self.decks_dir, exist_ok=True)
+            data = json.dumps({'titles': self.titles}, ensure_ascii=False, separators=(',', ':'))
+            write_file_atomic(self.path, data.encode('utf-8'))
+
+    def title_names(self):
+        return list(self.load())
+
+    def decks(self, title_name):
+        with self.lock:
+            return {name: dict(entry) for name, entry in self.load().get(title_name, {}).items()}
+
+    def add_title(self, title_name):
+        with self.lock:
+            if title_name not in self.load():
+                self.titles[title_name] = {}
+                self.save()
+
+    def update_deck(self, title_name, deck_name, **fields):
+        with self.lock:
+            decks = self.load().setdefault(title_name, {})
+            created = deck_name not in decks
+            entry = decks.setdefault(deck_name, self.new_entry())
+            if created or any(entry.get(key) != value for key, value in fields.items()):
+                entry.update(fields)
+                self.save()
+
+    def refresh_deck_dir(self, deck_dir):
+        # decks/<제목> 또는 decks/<제목>/<단어장> 디렉토리의 현재 상태를 목록에 반영
+        parts = os.path.relpath(os.path.abspath(deck_dir), os.path.abspath(self.decks_dir)).split(os.sep)
+        if len(parts) == 1:
+            self.add_title(parts[0])
+        elif len(parts) == 2:
+            self.update_deck(parts[0], parts[1], **self.scan_deck(deck_dir))
+
+    def remove_deck(self, title_name, deck_name):
+        with self.lock:
+            if self.load().get(title_name, {}).pop(deck_name, None) is not None:
+                self.save()
+
+# 단어 검색 색인 (단어장 디렉토리마다 하나, 예전 버전은 decks 디렉토리에 하나)과 한 번에 보여 줄 결과 수
+SEARCH_INDEX_NAME = 'search_index.json'
+SEARCH_RESULT_LIMIT = 200
+SEARCH_TOKEN_PATTERN = re.compile(r'\w+')
+
+# 한글 음절을 호환 자모로 풀어서 색인 (겹모음/겹받침도 나눠서 '삭', '사ㄱ'처럼 입력 중인 글자로도 '사과'를 찾음)
+HANGUL_CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+HANGUL_JUNGSEONG = 'ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ'
+HANGUL_JONGSEONG = ['', 'ㄱ', 'ㄲ', 'ㄳ', 'ㄴ', 'ㄵ', 'ㄶ', 'ㄷ', 'ㄹ', 'ㄺ', 'ㄻ', 'ㄼ', 'ㄽ', 'ㄾ', 'ㄿ', 'ㅀ',
+                    'ㅁ', 'ㅂ', 'ㅄ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+HANGUL_COMPOUND_JAMO = {'ㅘ': 'ㅗㅏ', 'ㅙ': 'ㅗㅐ', 'ㅚ': 'ㅗㅣ', 'ㅝ': 'ㅜㅓ', 'ㅞ': 'ㅜㅔ', 'ㅟ': 'ㅜㅣ', 'ㅢ': 'ㅡㅣ',
+                        'ㄳ': 'ㄱㅅ', 'ㄵ': 'ㄴㅈ', 'ㄶ': 'ㄴㅎ', 'ㄺ': 'ㄹㄱ', 'ㄻ': 'ㄹㅁ', 'ㄼ': 'ㄹㅂ', 'ㄽ': 'ㄹㅅ',
+                        'ㄾ': 'ㄹㅌ', 'ㄿ': 'ㄹㅍ', 'ㅀ': 'ㄹㅎ', 'ㅄ': 'ㅂㅅ'}
+
+def build_hangul_jamo_table():
+    table = {ord(jamo): parts for jamo, parts in HANGUL_COMPOUND_JAMO.items()}
+    for code in range(0xAC00, 0xD7A4):
+        offset = code - 0xAC00
+        jamo = HANGUL_CHOSEONG[offset // 588] + HANGUL_JUNGSEONG[offset % 588 // 28] + HANGUL_JONGSEONG[offset % 28]
+        table[code] = ''.join(HANGUL_COMPOUND_JAMO.get(ch, ch) for ch in jamo)
+    return table
+
+HANGUL_JAMO_TABLE = build_hangul_jamo_table()
+
+def search_tokens(text):
+    # 단어를 한글 자모로 풀어 둔 검색용 토큰 집합 (NFKC는 호환 자모를 조합용 자모로 바꾸므로 NFC만 적용)
+    text = unicodedata.normalize('NFC', text).casefold()
+    return {token.translate(HANGUL_JAMO_TABLE) for token in SEARCH_TOKEN_PATTERN.findall(text)}
+
+class SearchIndex:
+    """모든 단어장의 앞면/뒷면 단어에 대한 역색인 (토큰 → 단어장별 카드 위치).
+
+    토큰을 정렬해 둔 목록에서 이분 탐색으로 접두어가 같은 토큰을 찾고, 검색어의 모든 단어가 맞는 카드만 돌려준다.
+    카드를 추가/수정/삭제하면 그 카드의 토큰만 고치고, 색인은 단어장마다 search_index.json에 저장해
+    저장할 때는 바뀐 단어장만 다시 쓰고 다음 실행 때는 파일이 바뀐 단어장만 다시 만든다.
+    """
+    def __init__(self, decks_dir):
+        self.decks_dir = decks_dir
+        self.legacy_path = os.path.join(decks_dir, SEARCH_INDEX_NAME)  # 모든 단어장을 한 파일에 두던 예전 색인
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()  # 저장은 한 번에 하나씩 (늦게 시작한 저장이 나중에 씀)
+        self.decks = {}  # 단어장 경로 → {'stamp': 파일 상태, 'tokens': {토큰: [카드 위치]}}
+        self.token_decks = {}  # 토큰 → 그 토큰이 있는 단어장 경로 집합
+        self.vocabulary = None  # 정렬된 토큰 목록 (바뀌면 검색할 때 다시 정렬)
+        self.ready = False
+        self.dirty = set()  # 저장할 단어장 경로
+        self.error = None  # 불러오기에 실패했을 때의 오류 메시지
+        self.missed = set()  # 불러오는 동안 색인이 아직 없어서 반영하지 못한 카드 변경이 있는 단어장
+
+    @staticmethod
+    def deck_stamp(deck_dir):
+        stamp = []
+        for name in (DECK_SNAPSHOT_NAME, DECK_BINARY_SNAPSHOT_NAME, DECK_JOURNAL_NAME):
+            try:
+                stat = os.stat(os.path.join(deck_dir, name))
+                stamp.append([stat.st_mtime_ns, stat.st_size])
+            except OSError:
+                stamp.append(None)
+        return stamp
+
+    @staticmethod
+    def card_tokens(card):
+        return search_tokens(card['front']) | search_tokens(card['back'])
+
+    @staticmethod
+    def index_cards(cards):
+        tokens = {}
+        for position, card in enumerate(cards):
+            for token in SearchIndex.card_tokens(card):
+                tokens.setdefault(token, []).append(position)
+        return tokens
+
+    def deck_index_path(self, deck_path):
+        return os.path.join(self.decks_dir, deck_path, SEARCH_INDEX_NAME)
+
+    @staticmethod
+    def read_index_file(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def load(self, deck_paths):
+        # 단어장마다 저장된 색인을 읽고 파일이 바뀐 단어장만 다시 색인 (시간이 걸리므로 백그라운드 스레드에서 호출)
+        legacy = self.read_index_file(self.legacy_path)
+        legacy_decks = legacy.get('decks') if isinstance(legacy, dict) else None
+        if not isinstance(legacy_decks, dict):
+            legacy_decks = {}
+        decks = {}
+        changed = set()
+        for deck_path in deck_paths:
+            deck_dir = os.path.join(self.decks_dir, deck_path)
+            stamp = self.deck_stamp(deck_dir)
+            entry = self.read_index_file(self.deck_index_path(deck_path))
+            if entry is None and deck_path in legacy_decks:
+                entry = legacy_decks[deck_path]
+                changed.add(deck_path)  # 단어장별 파일로 옮김
+            if not isinstance(entry, dict) or not isinstance(entry.get('tokens'), dict) or entry.get('stamp') != stamp:
+                try:
+                    entry = {'stamp': stamp, 'tokens': self.index_cards(open_deck_store(deck_dir).open_cards())}
+                except (OSError, ValueError) as e:
+                    logging.warning(f"검색 색인 실패: {deck_path}: {e}")
+                    continue
+                changed.add(deck_path)
+            decks[deck_path] = entry
+        with self.lock:
+            # 불러오는 동안 update_deck으로 새로 만든 항목이 더 최신이므로 그대로 둠
+            for deck_path, entry in decks.items():
+                if deck_path not in self.decks:
+                    self.decks[deck_path] = entry
+                    if deck_path in changed:
+                        self.dirty.add(deck_path)
+            self.token_decks = {}
+            for deck_path, entry in self.decks.items():
+                for token in entry['tokens']:
+                    self.token_decks.setdefault(token, set()).add(deck_path)
+            self.vocabulary = None
+            self.ready = True
+            missed, self.missed = self.missed, set()
+        if changed:
+            self.save()
+        if legacy is not None:
+            try:
+                os.remove(self.legacy_path)
+            except OSError as e:
+                logging.warning(f"예전 검색 색인 삭제 실패: {e}")
+        return missed
+
+    def save(self):
+        # 바뀐 단어장의 색인 파일만 다시 씀 (크면 오래 걸리므로 앱은 백그라운드 스레드에서 호출)
+        with self.save_lock:
+            with self.lock:
+                dirty, self.dirty = self.dirty, set()
+                data = {deck_path: json.dumps(self.decks[deck_path], ensure_ascii=False, separators=(',', ':'))
+                        for deck_path in dirty if deck_path in self.decks}
+            for deck_path, text in data.items():
+                if not os.path.isdir(os.path.join(self.decks_dir, deck_path)):
+                    continue  # 그 사이 지운 단어장
+                try:
+                    write_file_atomic(self.deck_index_path(deck_path), text.encode('utf-8'))
+                except OSError as e:
+                    logging.error(f"검색 색인 저장 실패: {deck_path}: {e}")
+                    with self.lock:
+                        self.dirty.add(deck_path)
+
+    def update_deck(self, deck_path, cards):
+        entry = {'stamp': self.deck_stamp(os.path.join(self.decks_dir, deck_path)), 'tokens': self.index_cards(cards)}
+        with self.lock:
+            self.replace_tokens(deck_path, self.decks.get(deck_path), entry)
+            self.decks[deck_path] = entry
+            self.dirty.add(deck_path)
+
+    def touch_deck(self, deck_path):
+        # 단어장을 저장한 뒤: 색인은 이미 카드 변경 때 고쳤으므로 파일 상태만 갱신
+        stamp = self.deck_stamp(os.path.join(self.decks_dir, deck_path))
+        with self.lock:
+            entry = self.decks.get(deck_path)
+            if entry is not None:
+                entry['stamp'] = stamp
+                self.dirty.add(deck_path)
+
+    def add_cards(self, deck_path, start, cards):
+        with self.lock:
+            entry = self.decks.get(deck_path)
+            if entry is None:
+                self.note_missed(deck_path)
+                return
+            for offset, card in enumerate(cards):
+                self.add_posting(deck_path, entry, card, start + offset)
+            self.dirty.add(deck_path)
+
+    def update_card(self, deck_path, position, old_card, card):
+        with self.lock:
+            entry = self.decks.get(deck_path)
+            if entry is None:
+                self.note_missed(deck_path)
+                return
+            self.remove_posting(deck_path, entry, old_card, position)
+            self.add_posting(deck_path, entry, card, position)
+            self.dirty.add(deck_path)
+
+    def delete_card(self, deck_path, position, card):
+        # 지운 카드의 토큰을 빼고, 뒤쪽 카드 위치를 한 칸씩 당김 (위치 목록은 정렬되어 있음)
+        with self.lock:
+            entry = self.decks.get(deck_path)
+            if entry is None:
+                self.note_missed(deck_path)
+                return
+            self.remove_posting(deck_path, entry, card, position)
+            for positions in entry['tokens'].values():
+                for i in range(bisect.bisect_right(positions, position), len(positions)):
+                    positions[i] -= 1
+            self.dirty.add(deck_path)
+
+    def note_missed(self, deck_path):
+        # 불러오기가 끝나기 전의 변경은 load()가 읽은 파일에 없을 수 있으므로 끝난 뒤 그 단어장을 다시 색인
+        if not self.ready:
+            self.missed.add(deck_path)
+
+    def add_posting(self, deck_path, entry, card, position):
+        for token in self.card_tokens(card):
+            positions = entry['tokens'].get(token)
+            if positions is None:
+                positions = entry['tokens'][token] = []
+                self.add_token_deck(token, deck_path)
+            bisect.insort(positions, position)
+
+    def remove_posting(self, deck_path, entry, card, position):
+        for token in self.card_tokens(card):
+            positions = entry['tokens'].get(token)
+            if positions is None:
+                continue
+            i = bisect.bisect_left(positions, position)
+            if i < len(positions) and positions[i] == position:
+                del positions[i]
+            if not positions:
+                del entry['tokens'][token]
+                self.remove_token_deck(token, deck_path)
+
+    def remove_deck(self, deck_path):
+        with self.lock:
+            old = self.decks.pop(deck_path, None)
+            self.dirty.discard(deck_path)
+            if old is not None:
+                self.replace_tokens(deck_path, old, None)
+
+    def replace_tokens(self, deck_path, old, new):
+        old_tokens = set(old['tokens']) if old else set()
+        new_tokens = set(new['tokens']) if new else set()
+        for token in old_tokens - new_tokens:
+            self.remove_token_deck(token, deck_path)
+        for token in new_tokens - old_tokens:
+            self.add_token_deck(token, deck_path)
+
+    def add_token_deck(self, token, deck_path):
+        if token not in self.token_decks:
+            self.token_decks[token] = set()
+            self.vocabulary = None
+        self.token_decks[token].add(deck_path)
+
+    def remove_token_deck(self, token, deck_path):
+        paths = self.token_decks.get(token)
+        if paths is not None:
+            paths.discard(deck_path)
+            if not paths:
+                del self.token_decks[token]
+                self.vocabulary = None
+
+    def prefix_matches(self, term):
+        # term으로 시작하는 모든 토큰의 카드 위치를 단어장별로 모음
+        if self.vocabulary is None:
+            self.vocabulary = sorted(self.token_decks)
+        matches = {}
+        vocabulary = self.vocabulary
+        index = bisect.bisect_left(vocabulary, term)
+        while index < len(vocabulary) and vocabulary[index].startswith(term):
+            token = vocabulary[index]
+            index += 1
+            for deck_path in self.token_decks[token]:
+                matches.setdefault(deck_path, set()).update(self.decks[deck_path]['tokens'][token])
+        return matches
+
+    def search(self, query, limit=SEARCH_RESULT_LIMIT):
+        """검색어의 모든 단어가 (접두어로) 들어 있는 카드의 (단어장 경로, 카드 위치) 목록"""
+        terms = sorted(search_tokens(query), key=len, reverse=True)
+        if not terms:
+            return []
+        with self.lock:
+            result = None
+            for term in terms:
+                matches = self.prefix_matches(term)
+                if result is None:
+                    result = matches
+                else:
+                    result = {deck_path: positions & matches[deck_path]
+                              for deck_path, positions in result.items() if deck_path in matches}
+                    result = {deck_path: positions for deck_path, positions in result.items() if positions}
+                if not result:
+                    return []
+        hits = []
+        for deck_path in sorted(result):
+            hits.extend((deck_path, position) for position in sorted(result[deck_path]))
+            if len(hits) >= limit:
+                break
+        return hits[:limit]
+
+# 복습 일정 (SM-2): 단어장 디렉토리의 파일, 하루에 새로 배울 카드 수, 저장을 모으는 시간 (초)
+REVIEW_STATE_NAME = 'review.json'
+REVIEW_NEW_PER_DAY = 20
+REVIEW_SAVE_DELAY = 2.0
+REVIEW_RELEARN_SECONDS = 10 * 60  # '다시'를 누른 카드를 다시 보여 줄 때까지의 시간
+REVIEW_GRADES = (('다시', 1), ('어려움', 3), ('좋음', 4), ('쉬움', 5))
+
+def sm2_review(state, grade, now):
+    """SM-2 방식으로 복습 결과(grade: 0~5)를 반영한 새 상태를 반환"""
+    state = dict(state) if state else {'reps': 0, 'interval': 0, 'ease': 2.5, 'lapses': 0}
+    if grade < 3:
+        state['reps'] = 0
+        state['interval'] = 0
+        state['lapses'] += 1
+        state['due'] = now + REVIEW_RELEARN_SECONDS
+    else:
+        state['reps'] += 1
+        if state['reps'] == 1:
+            state['interval'] = 1
+        elif state['reps'] == 2:
+            state['interval'] = 6
+        else:
+            state['interval'] = round(state['interval'] * state['ease'])
+        state['due'] = now + state['interval'] * 86400
+    state['ease'] = max(1.3, state['ease'] + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02))
+    state['last'] = now
+    state['grade'] = grade
+    return state
+
+class ReviewScheduler:
+    """단어장 하나의 복습 일정. 카드별 상태를 정규화한 카드 해시로 저장하고 다음 복습 시각 순의 힙을 유지한다.
+
+    상태에는 카드 위치 힌트를 함께 두어, 위치가 바뀌지 않았으면 카드 목록을 훑지 않고 바로 찾는다.
+    힙의 오래된 항목은 꺼낼 때 버리므로, 다음 복습 카드를 찾는 데 O(log n)이 든다.
+    """
+    def __init__(self, deck_dir):
+        self.path = os.path.join(deck_dir, REVIEW_STATE_NAME)
+        self.lock = threading.RLock()
+        self.states = {}
+        self.new_cursor = 0  # 이 위치 앞의 카드는 모두 한 번 이상 복습함
+        self.new_day = None
+        self.new_count = 0
+        self.positions = None  # 위치 힌트가 틀렸을 때 한 번 만드는 해시 → 위치 표
+        self.dirty = False
+        self.save_timer = None
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.states = data.get('cards') or {}
+            self.new_cursor = data.get('new_cursor', 0)
+            self.new_day = data.get('new_day')
+            self.new_count = data.get('new_count', 0)
+        except (OSError, ValueError, AttributeError):
+            self.states = {}
+        self.heap = [(state['due'], key) for key, state in self.states.items()]
+        heapq.heapify(self.heap)
+
+    def save(self):
+        with self.lock:
+            if self.save_timer is not None:
+                self.save_timer.cancel()
+                self.save_timer = None
+            if not self.dirty:
+                return
+            data = json.dumps({'cards': self.states, 'new_cursor': self.new_cursor,
+                               'new_day': self.new_day, 'new_count': self.new_count}, separators=(',', ':'))
+            self.dirty = False
+        try:
+            write_file_atomic(self.path, data.encode('utf-8'))
+        except OSError as e:
+            logging.error(f"복습 기록 저장 실패: {e}")
+
+    def schedule_save(self):
+        with self.lock:
+            self.dirty = True
+            if self.save_timer is None:
+                self.save_timer = threading.Timer(REVIEW_SAVE_DELAY, self.save)
+                self.save_timer.daemon = True
+                self.save_timer.start()
+
+    def peek_due(self):
+        # 힙 맨 앞의 (복습 시각, 해시), 상태가 바뀌어 오래된 항목은 버림
+        with self.lock:
+            while self.heap:
+                due, key = self.heap[0]
+                state = self.states.get(key)
+                if state is not None and state['due'] == due:
+                    return due, key
+                heapq.heappop(self.heap)
+            return None
+
+    def iter_due(self, now):
+        # 복습 시각이 now 이전인 (시각, 해시)를 시각 순으로 (힙 복사본에서 꺼내므로 원래 힙은 그대로)
+        with self.lock:
+            heap = list(self.heap)
+        while heap:
+            due, key = heapq.heappop(heap)
+            if due > now:
+                return
+            yield due, key
+
+    def is_current(self, due, key):
+        state = self.states.get(key)
+        return state is not None and state['due'] == due
+
+    def close(self):
+        # 단어장을 지울 때: 예약된 저장을 취소
+        with self.lock:
+            self.dirty = False
+            if self.save_timer is not None:
+                self.save_timer.cancel()
+                self.save_timer = None
+
+    def drop(self, key):
+        with self.lock:
+            if self.states.pop(key, None) is not None:
+                self.schedule_save()
+
+    def position_of(self, key, cards):
+        state = self.states.get(key)
+        hint = state.get('pos') if state else None
+        if hint is not None and 0 <= hint < len(cards) and card_key(cards[hint]) == key:
+            return hint
+        if self.positions is not None:
+            position = self.positions.get(key)
+            if position is not None and position < len(cards) and card_key(cards[position]) == key:
+                return position
+        # 카드가 지워지거나 옮겨졌을 때만 한 번 훑어서 위치 표와 힌트를 다시 만듦
+        self.positions = {}
+        for position, card in enumerate(cards):
+            self.positions.setdefault(card_key(card), position)
+        for other_key, other_state in self.states.items():
+            if other_key in self.positions:
+                other_state['pos'] = self.positions[other_key]
+        return self.positions.get(key)
+
+    def next_due(self, cards, now=None):
+        """지금 복습할 카드의 위치 (복습할 카드가 없으면 오늘 배울 새 카드, 그것도 없으면 None)"""
+        now = now or time.time()
+        while True:
+            item = self.peek_due()
+            if item is None or item[0] > now:
+                break
+            position = self.position_of(item[1], cards)
+            if position is not None:
+                return position
+            self.drop(item[1])  # 지워진 카드의 상태
+        return self.next_new(cards)
+
+    def next_new(self, cards):
+        if self.new_day == time.strftime('%Y-%m-%d') and self.new_count >= REVIEW_NEW_PER_DAY:
+            return None
+        for position in range(self.new_cursor, len(cards)):
+            if card_key(cards[position]) not in self.states:
+                if position != self.new_cursor:
+                    self.new_cursor = position
+                    self.schedule_save()
+                return position
+        return None
+
+    def card_deleted(self, position):
+        # 카드를 지우면 뒤쪽 카드가 한 칸씩 당겨지므로 새 카드 위치도 함께 당김
+        with self.lock:
+            if position < self.new_cursor:
+                self.new_cursor -= 1
+                self.schedule_save()
+
+    def review(self, key, position, grade, now=None):
+        now = now or time.time()
+        with self.lock:
+            state = self.states.get(key)
+            if state is None:
+                today = time.strftime('%Y-%m-%d')
+                if self.new_day != today:
+                    self.new_day = today
+                    self.new_count = 0
+                self.new_count += 1
+            state = sm2_review(state, grade, now)
+            state['pos'] = position
+            self.states[key] = state
+            heapq.heappush(self.heap, (state['due'], key))
+        self.schedule_save()
+
+    def rename(self, old_key, new_key):
+        # 카드 내용을 고치면 해시가 바뀌므로 복습 상태를 새 해시로 옮김
+        with self.lock:
+            state = self.states.pop(old_key, None)
+            if state is not None and old_key != new_key:
+                self.states[new_key] = state
+                heapq.heappush(self.heap, (state['due'], new_key))
+                self.schedule_save()
+            elif state is not None:
+                self.states[old_key] = state
+
+# 학습 범위: 단어장 전체 / 별표 카드만 / 섞어서 / 번호 범위 / 지난번 '다시'로 매긴 카드만
+SESSION_MODES = ('전체', '별표', '섞기', '범위', '지난번 틀림')
+SESSION_WRONG_GRADE = 3  # 마지막 복습 결과가 이보다 낮으면 틀린 카드
+
+def build_session_view(cards, mode, scheduler=None, seed=None, start=0, stop=None):
+    """학습 범위에 들어가는 카드 위치 배열 (카드 사전은 복사하지 않음). '전체'면 None"""
+    if mode == '별표':
+        return array('l', (position for position, card in enumerate(cards) if card.get('starred')))
+    if mode == '섞기':
+        view = array('l', range(len(cards)))
+        random.Random(seed).shuffle(view)
+        return view
+    if mode == '범위':
+        stop = len(cards) if stop is None else min(stop, len(cards))
+        return array('l', range(max(start, 0), stop))
+    if mode == '지난번 틀림':
+        if scheduler is None:
+            return array('l')
+        positions = (scheduler.position_of(key, cards) for key, state in list(scheduler.states.items())
+                     if state.get('grade', SESSION_WRONG_GRADE) < SESSION_WRONG_GRADE)
+        return array('l', sorted(position for position in positions if position is not None))
+    return None
+
+def remove_session_position(view, index):
+    # 카드를 지운 뒤: 지운 카드를 빼고 뒤쪽 위치를 한 칸씩 당김
+    return array('l', (position - (position > index) for position in view if position != index))
+
+class GlobalReviewQueue:
+    """모든 단어장의 복습할 카드를 복습 시각 순으로 합친 대기열.
+
+    단어장별 복습 힙을 heapq.merge로 k-way 병합하므로 review.json만 읽고, 카드는 실제로 복습할 단어장만 연다.
+    단어장을 여는 데 시간이 걸리므로 지금 단어장에 복습할 카드가 남아 있으면 그 카드부터 모두 보여 준 뒤 다음 단어장으로 넘어간다.
+    새 카드는 단어장별 복습에서만 보여 준다.
+    """
+    def __init__(self, deck_paths, get_scheduler):
+        self.deck_paths = deck_paths
+        self.get_scheduler = get_scheduler
+        self.merged = None
+        self.deck_path = None  # 마지막으로 돌려준 카드의 단어장
+
+    def start(self):
+        now = time.time()
+        streams = [self.due_stream(deck_path, now) for deck_path in self.deck_paths]
+        self.merged = heapq.merge(*streams)
+
+    def due_stream(self, deck_path, now):
+        scheduler = self.get_scheduler(deck_path)
+        for due, key in scheduler.iter_due(now):
+            yield due, deck_path, key
+
+    def next(self):
+        """다음으로 복습할 (단어장 경로, 카드 해시, 복습 일정), 없으면 None"""
+        if self.deck_path is not None:
+            scheduler = self.get_scheduler(self.deck_path)
+            item = scheduler.peek_due()
+            if item is not None and item[0] <= time.time():
+                return self.deck_path, item[1], scheduler
+        restarted = self.merged is None
+        if self.merged is None:
+            self.start()
+        while True:
+            item = next(self.merged, None)
+            if item is None:
+                if restarted:
+                    return None
+                # 이번 세션에 '다시'로 미룬 카드가 그 사이 다시 복습할 때가 되었는지 한 번 더 확인
+                self.start()
+                restarted = True
+                continue
+            due, deck_path, key = item
+            scheduler = self.get_scheduler(deck_path)
+            if scheduler.is_current(due, key):
+                self.deck_path = deck_path
+                return deck_path, key, scheduler
+
+class LazyScreenManager(ScreenManager):
+    """화면을 처음 이동하거나 찾을 때 만드는 ScreenManager (시작 시간 단축)"""
+    def __init__(self, screen_classes, **kwargs):
+        super().__init__(**kwargs)
+        self.screen_classes = screen_classes
+
+    def get_screen(self, name):
+        if not self.has_screen(name) and name in self.screen_classes:
+            logging.debug(f"화면 생성: {name}")
+            self.add_widget(self.screen_classes[name](name=name))
+        return super().get_screen(name)
+
 class FlashcardApp(App):
     def __init__(self):
         super().__init__()
         self.tts_engine = None
         self.tts_initialized = False
+        self.tts_client = None
+        self.audio_cache = None
+        self.tts_prefetcher = None
+        self.tts_player = None
+        self.deck_audio_cache = None
+        self.tts_inflight = {}  # 캐시 키 -> 진행 중인 합성의 Future (미리 합성과 재생이 같은 음성을 두 번 합성하지 않게)
+        self.tts_inflight_lock = threading.Lock()
+        self.clip_cache = ClipCache()
+        self.wake_lock = None
+        self.current_deck = None
+        self.cards = ListCardSource()
+        self.card_index = CardIndex()
+        self.deck_store = None
+        self.deck_saver = DeckSaver(on_error=self.on_save_error, on_saved=self.on_deck_saved)
+        self.deck_catalog = None
+        self.search_index = None
+        self.scheduler = None
+        self.schedulers = {}  # 단어장 경로 → ReviewScheduler
+        self.global_review = None
+        self.startup_timer = StartupTimer()
+        self.startup_timer.mark('모듈 로드')
+
+    def init_tts_backends(self):
+        # 첫 화면을 그린 뒤 백그라운드 스레드에서 TTS 백엔드를 불러오고 초기화
         if platform == 'android':
-            self.init_android_tts()
+            self.init_android_tts()  # 준비 시간은 onInit에서 기록
+            self.audio_cache.ensure_scanned()
+            return
+        if GOOGLE_TTS_AVAILABLE:
+            self.init_google_tts()
+        else:
+            try:
+                load_gtts()
+            except ImportError:
+                pass
+        self.audio_cache.ensure_scanned()
+        self.mark_tts_ready()
+
+    def mark_tts_ready(self):
+        self.startup_timer.mark('TTS 준비')
+        logging.info(f"TTS 준비: {self.startup_timer.marks[-1][1]:.3f}초")
 
     def init_android_tts(self):
+        # 엔진 생성만 요청하고 기다리지 않음. 준비되기 전의 재생 요청은 TTSPlayer 대기열에 쌓임
         try:
             logging.debug("TTS 초기화 시도")
-            self.tts_engine = TextToSpeech(activity, TTSInitListener(self))
-            for _ in range(50):
-                if self.tts_initialized:
-                    logging.debug("TTS 초기화 완료")
-                    break
-                import time
-                time.sleep(0.1)
-            if not self.tts_initialized:
-                logging.error("TTS 초기화 시간 초과")
+            load_android_classes()
+            self.tts_init_listener = TTSInitListener(self)
+            self.tts_utterance_listener = TTSUtteranceListener(self)
+            self.tts_engine = TextToSpeech(activity, self.tts_init_listener)
+            self.tts_engine.setOnUtteranceCompletedListener(self.tts_utterance_listener)
         except Exception as e:
             logging.error(f"TTS 초기화 중 예외 발생: {e}")
+            self.tts_engine = None
+            if self.tts_player:
+                self.tts_player.mark_ready()
+
+    def on_android_tts_init(self, success):
+        # TTSInitListener.onInit에서 호출 (안드로이드 메인 스레드)
+        self.tts_initialized = success
+        if success:
+            self.mark_tts_ready()
+        if self.tts_player:
+            self.tts_player.mark_ready()
 
     def init_google_tts(self):
         if platform != 'android':
             try:
-                self.tts_client = texttospeech.TextToSpeechClient()
+                self.tts_client = load_google_tts().TextToSpeechClient()
                 print("Google Cloud TTS 초기화 성공")
             except Exception as e:
                 print(f"Google Cloud TTS 초기화 실패: {e}")
@@ -193,45 +2196,288 @@ class FlashcardApp(App):
                 os.makedirs(self.app_dir, exist_ok=True)
                 logging.debug(f"디렉토리 생성: {self.app_dir}")
             ensure_kivy_config_dir()  # Kivy 디렉토리 설정 추가
+            self.deck_catalog = DeckCatalog(os.path.join(self.app_dir, 'decks'))
+            self.search_index = SearchIndex(os.path.join(self.app_dir, 'decks'))
+            threading.Thread(target=self.load_search_index, daemon=True).start()
+            self.audio_cache = AudioCache(os.path.join(self.app_dir, TTS_CACHE_DIR_NAME))
+            self.tts_prefetcher = TTSPrefetcher(self)
+            self.tts_player = TTSPlayer(self)
             if not setup_fonts(self):
                 logging.warning("폰트 설정 실패, 기본 폰트로 진행")
             logging.debug("ScreenManager 초기화 시작")
-            self.sm = ScreenManager()
-            logging.debug("화면 추가 시작")
-            self.sm.add_widget(MainScreen(name='main'))
-            self.sm.add_widget(AddCardScreen(name='add_card'))
-            self.sm.add_widget(BulkAddScreen(name='bulk_add'))
-            self.sm.add_widget(FlashcardScreen(name='flashcard'))
-            self.sm.add_widget(ExcelScreen(name='excel'))
-            self.sm.add_widget(DeckSelectionScreen(name='deck_selection'))
+            # 첫 화면만 만들고 나머지 화면은 처음 이동할 때 만듦
+            self.sm = LazyScreenManager({
+                'main': MainScreen,
+                'add_card': AddCardScreen,
+                'bulk_add': BulkAddScreen,
+                'flashcard': FlashcardScreen,
+                'excel': ExcelScreen,
+                'deck_selection': DeckSelectionScreen,
+                'search': SearchScreen,
+            })
+            self.sm.get_screen('main')
+            self.startup_timer.mark('build')
             logging.debug("build 메서드 완료")
             return self.sm
 
+    def on_start(self):
+        Window.bind(on_flip=self.on_first_frame)
+
+    def on_first_frame(self, *args):
+        Window.unbind(on_flip=self.on_first_frame)
+        self.startup_timer.mark('첫 화면')
+        self.startup_timer.report()
+        threading.Thread(target=self.init_tts_backends, daemon=True).start()
+
+    def on_pause(self):
+        # 자동 재생이 화면이 꺼진 뒤에도 이어지도록 앱을 종료하지 않고 일시정지
+        # (일시정지 중에 앱이 종료될 수 있으므로 모아 둔 변경은 바로 기록)
+        self.deck_saver.flush()
+        self.save_search_index()
+        self.save_schedulers()
+        return True
+
+    def on_resume(self):
+        pass
+
+    def acquire_wake_lock(self):
+        # 화면이 꺼져도 CPU가 잠들지 않도록 유지 (안드로이드 WAKE_LOCK 권한 필요)
+        if platform != 'android' or self.wake_lock is not None:
+            return
+        try:
+            load_android_classes()
+            power_manager = activity.getSystemService(Context.POWER_SERVICE)
+            self.wake_lock = power_manager.newWakeLock(PowerManager.PARTIAL_WAKE_LOCK, 'FlashcardApp:drill')
+            self.wake_lock.acquire()
+        except Exception as e:
+            logging.error(f"웨이크 락 획득 실패: {e}")
+            self.wake_lock = None
+
+    def release_wake_lock(self):
+        if self.wake_lock is not None:
+            try:
+                self.wake_lock.release()
+            except Exception as e:
+                logging.error(f"웨이크 락 해제 실패: {e}")
+            self.wake_lock = None
+
+    def on_stop(self):
+        self.deck_saver.flush()
+        self.save_search_index()
+        self.save_schedulers()
+        self.release_wake_lock()
+        if self.tts_player:
+            self.tts_player.shutdown()
+        if self.tts_prefetcher:
+            self.tts_prefetcher.shutdown()
+        self.clip_cache.clear()
+
+    def get_tts_audio(self, text, language, voice):
+        """캐시된 오디오 파일 경로를 반환하고, 없으면 합성해서 캐시에 저장"""
+        voice_name = tts_cache_voice(voice, self.tts_client)
+        if self.deck_audio_cache:
+            path = self.deck_audio_cache.get(text, language, voice_name)
+            if path:
+                return path
+        path = self.audio_cache.get(text, language, voice_name)
+        if path:
+            return path
+        return self.synthesize_once(text, language, voice_name,
+                                    lambda: synthesize_audio(text, language, voice, self.tts_client))
+
+    def synthesize_once(self, text, language, voice_name, synthesize):
+        """같은 캐시 키를 다른 스레드가 합성하고 있으면 그 결과를 기다리고, 아니면 합성해서 캐시에 저장"""
+        key = AudioCache.make_key(text, language, voice_name)
+        with self.tts_inflight_lock:
+            future = self.tts_inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self.tts_inflight[key] = Future()
+        if not owner:
+            return future.result()
+        try:
+            # 확인한 뒤 앞선 합성이 끝났을 수 있으므로 캐시를 한 번 더 봄
+            path = self.audio_cache.get(text, language, voice_name)
+            if not path:
+                path = self.audio_cache.put(text, language, voice_name, synthesize())
+            future.set_result(path)
+            return path
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.tts_inflight_lock:
+                del self.tts_inflight[key]
+
+    def get_tts_sound(self, text, language, voice):
+        """재생할 Sound 객체를 반환 (메모리 클립 캐시 -> 디스크 캐시 -> 합성 순서)"""
+        key = (text, language, tts_cache_voice(voice, self.tts_client))
+        sound = self.clip_cache.get(key)
+        if sound is None:
+            sound = SoundLoader.load(self.get_tts_audio(text, language, voice))
+            if sound:
+                self.clip_cache.put(key, sound)
+        return sound
+
+    def get_tts_combined_audio(self, utterances, pause):
+        """여러 발화를 SSML 한 번의 요청으로 합성해 캐시하고 파일 경로를 반환 (Google Cloud TTS 전용)"""
+        break_ms = int(pause * 1000)
+        text = '\x1e'.join(u[0] for u in utterances)
+        language = '+'.join(u[1] for u in utterances)
+        voice_name = '+'.join(tts_cache_voice(u[2], self.tts_client) for u in utterances) + f'@{break_ms}'
+        for cache in (self.deck_audio_cache, self.audio_cache):
+            path = cache.get(text, language, voice_name) if cache else None
+            if path:
+                return path
+        return self.synthesize_once(text, language, voice_name,
+                                    lambda: synthesize_ssml_sequence(utterances, break_ms, self.tts_client))
+
+    def get_tts_combined_sound(self, utterances, pause):
+        key = (tuple(utterances), pause)
+        sound = self.clip_cache.get(key)
+        if sound is None:
+            sound = SoundLoader.load(self.get_tts_combined_audio(utterances, pause))
+            if sound:
+                self.clip_cache.put(key, sound)
+        return sound
+
     def load_cards(self):
         if self.current_deck:
             deck_dir = os.path.join(self.app_dir, 'decks', self.current_deck)
-            file_path = os.path.join(deck_dir, 'flashcards.json')
+            audio_dir = os.path.join(deck_dir, DECK_AUDIO_DIR_NAME)
+            if not os.path.isdir(audio_dir):
+                self.deck_audio_cache = None
+            elif not self.deck_audio_cache or self.deck_audio_cache.cache_dir != audio_dir:
+                self.deck_audio_cache = AudioCache(audio_dir, max_bytes=None)
+            self.deck_saver.flush()
+            if self.scheduler:
+                self.scheduler.save()
+            self.scheduler = self.get_scheduler(self.current_deck)
+            self.deck_store = open_deck_store(deck_dir)
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    self.cards = json.load(f)
+                self.cards = self.deck_store.open_cards(repair=True)
+                self.card_index = self.deck_store.open_index()
                 print(f"불러온 카드 수: {len(self.cards)}")
-            except FileNotFoundError:
-                self.cards = []
-            except json.JSONDecodeError:
-                self.cards = []
+            except ValueError:
+                self.cards = ListCardSource()
+                self.card_index = CardIndex()
                 self.show_popup("오류", "카드 파일이 손상되었습니다.")
+            if isinstance(self.cards, PagedCardSource):
+                self.cards.sync = self.deck_saver.flush
+            if isinstance(self.card_index, SqliteCardIndex):
+                self.card_index.sync = self.deck_saver.flush
+            self.deck_saver.attach(self.deck_store, self.cards, self.current_deck)
+
+    def update_deck_catalog(self, deck_path=None, cards=None, **fields):
+        # 저장 스레드에서도 호출됨: 단어장(기본값은 지금 단어장)의 카드 수와 주어진 항목을 단어장 목록에 반영
+        deck_path = deck_path or self.current_deck
+        cards = self.cards if cards is None else cards
+        if self.deck_catalog and deck_path and os.path.isdir(os.path.join(self.app_dir, 'decks', deck_path)):
+            title_name, deck_name = os.path.split(deck_path)
+            self.deck_catalog.update_deck(title_name, deck_name, cards=len(cards), **fields)
+
+    def on_deck_saved(self, deck_path, cards):
+        # 저장 스레드에서 호출됨: 방금 기록한 단어장의 목록 항목과 검색 색인을 갱신
+        # (단어장을 바꾸는 중이면 app.current_deck은 이미 다음 단어장을 가리킬 수 있음)
+        self.update_deck_catalog(deck_path, cards)
+        if self.search_index and deck_path:
+            self.search_index.touch_deck(deck_path)
+
+    def load_search_index(self):
+        try:
+            deck_paths = [os.path.join(title_name, deck_name)
+                          for title_name in self.deck_catalog.title_names()
+                          for deck_name in self.deck_catalog.decks(title_name)]
+            started = time.time()
+            missed = self.search_index.load(deck_paths)
+            for deck_path in missed:
+                self.reindex_search_deck(deck_path)
+            logging.debug(f"검색 색인 준비 완료: {len(deck_paths)}개 단어장, {time.time() - started:.2f}초")
+        except Exception as e:
+            logging.error(f"검색 색인 불러오기 실패: {e}")
+            self.search_index.error = str(e)
+
+    def reindex_search_deck(self, deck_path):
+        # 모아 둔 변경을 기록하고 저장기 잠금을 잡은 채 파일을 색인하므로 그동안 카드 변경이 끼어들지 않음
+        # (잠금 순서는 DeckSaver.flush와 같게 write_lock → lock)
+        with self.deck_saver.write_lock, self.deck_saver.lock:
+            self.deck_saver.flush()
+            cards = open_deck_store(os.path.join(self.app_dir, 'decks', deck_path)).open_cards()
+            self.search_index.update_deck(deck_path, cards)
+
+    def refresh_search_deck(self, deck_dir):
+        # 파일을 불러온 단어장을 다시 색인 (decks/<제목>/<단어장>만 해당)
+        deck_path = os.path.relpath(os.path.abspath(deck_dir), os.path.abspath(os.path.join(self.app_dir, 'decks')))
+        if self.search_index and len(deck_path.split(os.sep)) == 2:
+            self.search_index.update_deck(deck_path, open_deck_store(deck_dir).open_cards())
+
+    def save_search_index(self):
+        # 큰 색인은 쓰는 데 시간이 걸리므로 UI 스레드를 막지 않음 (종료할 때도 끝까지 쓰도록 daemon 스레드가 아님)
+        if self.search_index:
+            threading.Thread(target=self.search_index.save, name='search-index-save').start()
+
+    def on_save_error(self, error):
+        # 저장 스레드에서 호출되므로 팝업은 Clock으로 넘김
+        Clock.schedule_once(lambda dt: self.show_popup("오류", f"카드 저장 실패: {str(error)}"))
+
+    def add_cards(self, cards):
+        deck_path = self.current_deck
+        def change():
+            start = len(self.cards)
+            self.cards.extend(cards)
+            for card in cards:
+                self.card_index.add(card)
+            self.search_index.add_cards(deck_path, start, cards)
+        self.deck_saver.record(change, lambda store: store.add(cards))
+
+    def update_card(self, index, **fields):
+        deck_path = self.current_deck
+        card = self.cards[index]
+        old_card = {'front': card['front'], 'back': card['back']}
+        old_key = card_key(card)
+        def change():
+            self.card_index.remove(card)
+            card.update(fields)
+            self.card_index.add(card)
+            self.search_index.update_card(deck_path, index, old_card, card)
+        self.deck_saver.record(change, lambda store: store.update(index, card))
+        if self.scheduler:
+            self.scheduler.rename(old_key, card_key(card))
+
+    def get_scheduler(self, deck_path):
+        scheduler = self.schedulers.get(deck_path)
+        if scheduler is None:
+            scheduler = ReviewScheduler(os.path.join(self.app_dir, 'decks', deck_path))
+            self.schedulers[deck_path] = scheduler
+        return scheduler
+
+    def save_schedulers(self):
+        for scheduler in list(self.schedulers.values()):
+            scheduler.save()
+
+    def start_global_review(self):
+        deck_paths = [os.path.join(title_name, deck_name)
+                      for title_name in self.deck_catalog.title_names()
+                      for deck_name in self.deck_catalog.decks(title_name)]
+        self.global_review = GlobalReviewQueue(deck_paths, self.get_scheduler)
+
+    def review_card(self, index, grade):
+        if self.scheduler and 0 <= index < len(self.cards):
+            self.scheduler.review(card_key(self.cards[index]), index, grade)
 
-    def save_cards(self):
-        if self.current_deck:
-            deck_dir = os.path.join(self.app_dir, 'decks', self.current_deck)
-            file_path = os.path.join(deck_dir, 'flashcards.json')
-            try:
-                os.makedirs(deck_dir, exist_ok=True)
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(self.cards, f, ensure_ascii=False, indent=2)
-                print(f"카드가 저장되었습니다: {len(self.cards)}개")
-            except Exception as e:
-                self.show_popup("오류", f"카드 저장 실패: {str(e)}")
+    def delete_card(self, index):
+        deck_path = self.current_deck
+        card = self.cards[index]  # 페이지를 읽을 수 있으므로 저장기 잠금 밖에서 읽음
+        def change():
+            self.card_index.remove_at(self.cards, index)
+            self.cards.pop(index)
+            self.search_index.delete_card(deck_path, index, card)
+        self.deck_saver.record(change, lambda store: store.delete(index))
+        if self.scheduler:
+            self.scheduler.card_deleted(index)
+
+    def has_card(self, card):
+        return self.card_index.contains(card)
 
     def show_popup(self, title, message):
         font_path = os.path.join(os.getcwd(), 'fonts', 'NanumGothic-Regular.ttf')
@@ -249,6 +2495,8 @@ class MainScreen(Screen):
         layout.add_widget(Button(text='플래시카드 모드', font_name=font_path, on_press=self.go_to_flashcard))
         layout.add_widget(Button(text='엑셀 모드', font_name=font_path, on_press=self.go_to_excel))
         layout.add_widget(Button(text='단어장 제목 선택', font_name=font_path, on_press=self.go_to_deck_selection))
+        layout.add_widget(Button(text='단어 검색', font_name=font_path, on_press=self.go_to_search))
+        layout.add_widget(Button(text='전체 복습', font_name=font_path, on_press=self.go_to_global_review))
         self.add_widget(layout)
 
     def go_to_add_card(self, instance):
@@ -278,6 +2526,13 @@ class MainScreen(Screen):
     def go_to_deck_selection(self, instance):
         self.manager.current = 'deck_selection'
 
+    def go_to_search(self, instance):
+        self.manager.current = 'search'
+
+    def go_to_global_review(self, instance):
+        App.get_running_app().start_global_review()
+        self.manager.current = 'flashcard'
+
 class AddCardScreen(Screen):
     def __init__(self, app_dir=None, **kwargs):
         super().__init__(**kwargs)
@@ -305,8 +2560,10 @@ class AddCardScreen(Screen):
         if front and back:
             card = {'front': front, 'back': back, 'starred': self.starred}
             app = App.get_running_app()
-            app.cards.append(card)
-            app.save_cards()
+            if app.has_card(card):
+                app.show_popup("알림", "이미 같은 카드가 있습니다.")
+                return
+            app.add_cards([card])
             self.front_input.text = ''
             self.back_input.text = ''
             self.starred = False
@@ -330,41 +2587,53 @@ class BulkAddScreen(Screen):
         self.add_widget(layout)
 
     def bulk_add(self, instance):
-        text = self.input_area.text.strip()
-        lines = text.split('\n')
-        cards = []
-        for line in lines:
-            if '-' in line:
-                front, back = line.split('-', 1)
-                cards.append({'front': front.strip(), 'back': back.strip(), 'starred': False})
         app = App.get_running_app()
-        app.cards.extend(cards)
-        app.save_cards()
+        cards = []
+        keys = set()
+        skipped = 0
+        duplicates = 0
+        for _, card, _ in parse_card_lines(io.StringIO(self.input_area.text)):
+            if card is None:
+                skipped += 1
+                continue
+            key = card_key(card)
+            if key in keys or app.has_card(card):
+                duplicates += 1
+                continue
+            keys.add(key)
+            cards.append(card)
+        app.add_cards(cards)
         self.input_area.text = ''
-        App.get_running_app().show_popup("성공", f"{len(cards)}개의 카드가 추가되었습니다.")
+        message = f"{len(cards)}개의 카드가 추가되었습니다."
+        if skipped:
+            message += f"\n(구분자가 없어 건너뛴 줄: {skipped}개)"
+        if duplicates:
+            message += f"\n(이미 있어 건너뛴 카드: {duplicates}개)"
+        App.get_running_app().show_popup("성공", message)
 
     def go_back(self, instance):
         self.manager.current = 'main'
 
+# 자동 재생(오디오 드릴)에서 앞면과 뒷면 사이, 카드와 카드 사이 쉬는 시간 (초)
+DRILL_SIDE_PAUSE = 1.0
+DRILL_CARD_PAUSE = 1.5
+
 class FlashcardScreen(Screen):
     def __init__(self, app_dir=None, **kwargs):
         super().__init__(**kwargs)
         self.app_dir = app_dir or get_app_directory()
         font_path = os.path.join(os.getcwd(), 'fonts', 'NanumGothic-Regular.ttf')
-        self.current_sound = None
         self.current_card_index = 0
+        self.start_card_index = None  # 검색 결과에서 열 때 처음 보여 줄 카드 (None이면 복습할 카드부터)
+        self.session = None  # 학습 범위의 카드 위치 배열 (None이면 단어장 전체)
+        self.session_index = 0  # 학습 범위 안에서 지금 카드의 순서
         self.showing_front = True
         self.tts_enabled = True
         self.initial_load = True
-        self.stop_tts_event = threading.Event()
-
-        self.voice_options = {
-            "ko-KR": ["ko-KR-Neural2-A", "ko-KR-Neural2-B", "ko-KR-Neural2-C"],
-            "en-US": ["en-US-Neural2-A", "en-US-Standard-B", "en-US-Neural2-C"],
-            "fr-FR": ["fr-FR-Standard-A", "fr-FR-Standard-B", "fr-FR-Standard-C"],
-            "es-ES": ["es-ES-Standard-A", "es-ES-Standard-B"],
-            "de-DE": ["de-DE-Standard-A", "de-DE-Standard-B"]
-        }
+        self.drill_active = False
+        self.drill_timer = None
+
+        self.voice_options = VOICE_OPTIONS
         self.word_language = "en-US"
         self.meaning_language = "ko-KR"
         self.word_voice = self.voice_options["en-US"][0]
@@ -378,14 +2647,24 @@ class FlashcardScreen(Screen):
         self.first_row_layout.add_widget(self.tts_button)
         self.tts_toggle_button = Button(text='TTS 끄기', font_name=font_path, on_press=self.toggle_tts)
         self.first_row_layout.add_widget(self.tts_toggle_button)
+        self.drill_button = Button(text='자동 재생', font_name=font_path, on_press=self.toggle_drill)
+        self.first_row_layout.add_widget(self.drill_button)
         self.layout.add_widget(self.first_row_layout)
 
         self.second_row_layout = BoxLayout(orientation='horizontal', size_hint_y=None, height=50)
         self.second_row_layout.add_widget(Button(text='이전 카드', font_name=font_path, on_press=self.prev_card))
         self.second_row_layout.add_widget(Button(text='카드 뒤집기', font_name=font_path, on_press=self.flip_card))
         self.second_row_layout.add_widget(Button(text='다음 카드', font_name=font_path, on_press=self.next_card))
+        self.session_spinner = Spinner(text=SESSION_MODES[0], font_name=font_path, values=SESSION_MODES)
+        self.session_spinner.bind(text=self.on_session_select)
+        self.second_row_layout.add_widget(self.session_spinner)
         self.layout.add_widget(self.second_row_layout)
 
+        self.grade_layout = BoxLayout(orientation='horizontal', size_hint_y=None, height=50)
+        for text, grade in REVIEW_GRADES:
+            self.grade_layout.add_widget(Button(text=text, font_name=font_path, on_press=lambda x, g=grade: self.grade_card(g)))
+        self.layout.add_widget(self.grade_layout)
+
         self.card_label = Label(
             text='', font_name=font_path, font_size=24, halign='center', valign='middle', size_hint=(1, 0.8),
             text_size=(self.width * 0.95, None)
@@ -419,22 +2698,44 @@ class FlashcardScreen(Screen):
         self.word_voice_spinner.values = self.voice_options[text]
         self.word_voice_spinner.text = self.voice_options[text][0]
         self.word_voice = self.voice_options[text][0]
+        self.prefetch_upcoming_cards()
 
     def on_meaning_language_select(self, spinner, text):
         self.meaning_language = text
         self.meaning_voice_spinner.values = self.voice_options[text]
         self.meaning_voice_spinner.text = self.voice_options[text][0]
         self.meaning_voice = self.voice_options[text][0]
+        self.prefetch_upcoming_cards()
 
     def on_word_voice_select(self, spinner, text):
         self.word_voice = text
+        self.prefetch_upcoming_cards()
 
     def on_meaning_voice_select(self, spinner, text):
         self.meaning_voice = text
+        self.prefetch_upcoming_cards()
+
+    def prefetch_upcoming_cards(self):
+        app = App.get_running_app()
+        if not self.manager or self.manager.current != self.name or not app.cards:
+            return
+        if platform == 'android' and app.tts_engine:
+            return  # 안드로이드 TTS 엔진은 직접 재생하므로 미리 합성할 필요 없음
+        utterances = []
+        if self.showing_front:
+            card = app.cards[self.current_card_index]
+            utterances.append((card['back'], self.meaning_language, self.meaning_voice))
+        positions = self.view_positions()
+        for offset in range(1, min(TTS_PREFETCH_AHEAD, len(positions) - 1) + 1):
+            card = app.cards[positions[(self.session_index + offset) % len(positions)]]
+            utterances.append((card['front'], self.word_language, self.word_voice))
+            utterances.append((card['back'], self.meaning_language, self.meaning_voice))
+        app.tts_prefetcher.schedule(utterances)
 
     def play_current_card_tts(self, instance):
+        self.stop_drill()
         app = App.get_running_app()
-        if self.tts_enabled and app.cards:
+        if self.tts_enabled and app.cards and self.view_positions():
             card = app.cards[self.current_card_index]
             text = card['front'] if self.showing_front else card['back']
             language = self.word_language if self.showing_front else self.meaning_language
@@ -442,104 +2743,256 @@ class FlashcardScreen(Screen):
             self.play_tts(text, language, voice)
 
     def play_tts(self, text, language, voice):
+        App.get_running_app().tts_player.play([(text, language, voice)])
+
+    def on_enter(self):
         app = App.get_running_app()
-        if self.current_sound and self.current_sound.state == 'play':
-            self.current_sound.stop()
-        self.stop_tts_event.clear()
+        self.reset_session()
+        if app.global_review:
+            self.initial_load = True
+            self.show_next_global()
+            return
+        if self.start_card_index is not None:
+            self.go_to_card(self.start_card_index)
+        else:
+            due_position = app.scheduler.next_due(app.cards) if app.scheduler else None
+            self.go_to_card(due_position if due_position is not None else 0)
+        self.start_card_index = None
+        self.initial_load = True
+        app.update_deck_catalog(last_studied=int(time.time()))
+        self.show_card()
 
-        def tts_thread():
-            temp_file_name = None
-            try:
-                if platform == 'android' and app.tts_engine:
-                    locale = Locale('ko', 'KR') if language == 'ko-KR' else Locale('en', 'US')
-                    app.tts_engine.setLanguage(locale)
-                    app.tts_engine.speak(text, TextToSpeech.QUEUE_FLUSH, None)
-                    time.sleep(len(text) * 0.1)
-                elif app.tts_client:
-                    synthesis_input = texttospeech.SynthesisInput(text=text)
-                    voice_params = texttospeech.VoiceSelectionParams(language_code=language, name=voice)
-                    audio_config = texttospeech.AudioConfig(audio_encoding=texttospeech.AudioEncoding.MP3)
-                    response = app.tts_client.synthesize_speech(input=synthesis_input, voice=voice_params, audio_config=audio_config)
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as temp_file:
-                        temp_file.write(response.audio_content)
-                        temp_file_name = temp_file.name
-                    self.current_sound = SoundLoader.load(temp_file_name)
-                    if self.current_sound:
-                        self.current_sound.play()
-                        while self.current_sound.state == 'play' and not self.stop_tts_event.is_set():
-                            time.sleep(0.1)
-                else:
-                    tts = gTTS(text=text, lang=language[:2])
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as temp_file:
-                        tts.save(temp_file.name)
-                        temp_file_name = temp_file.name
-                    self.current_sound = SoundLoader.load(temp_file_name)
-                    if self.current_sound:
-                        self.current_sound.play()
-                        while self.current_sound.state == 'play' and not self.stop_tts_event.is_set():
-                            time.sleep(0.1)
-            except Exception as e:
-                print(f"TTS 재생 오류: {e}")
-            finally:
-                if self.current_sound:
-                    self.current_sound.stop()
-                    self.current_sound = None
-                if temp_file_name and os.path.exists(temp_file_name):
-                    try:
-                        os.unlink(temp_file_name)
-                    except Exception as e:
-                        print(f"파일 삭제 오류: {e}")
+    def on_leave(self):
+        self.stop_drill()
+        App.get_running_app().tts_prefetcher.cancel()
+
+    def view_positions(self):
+        # 지금 학습 범위의 카드 위치들 (범위가 없으면 단어장 전체)
+        return self.session if self.session is not None else range(len(App.get_running_app().cards))
+
+    def go_to_card(self, position):
+        self.current_card_index = position
+        if self.session is None:
+            self.session_index = position
+        elif position in self.session:
+            self.session_index = self.session.index(position)
+
+    def step_card(self, step):
+        # 학습 범위 안에서 step만큼 이동 (범위가 비어 있으면 False)
+        positions = self.view_positions()
+        if not positions:
+            return False
+        self.session_index = (self.session_index + step) % len(positions)
+        self.current_card_index = positions[self.session_index]
+        return True
 
-        threading.Thread(target=tts_thread).start()
+    def reset_session(self):
+        self.session = None
+        self.session_spinner.unbind(text=self.on_session_select)
+        self.session_spinner.text = SESSION_MODES[0]
+        self.session_spinner.bind(text=self.on_session_select)
 
-    def on_enter(self):
+    def on_session_select(self, spinner, text):
+        self.stop_drill()
         app = App.get_running_app()
-        self.current_card_index = 0
-        self.initial_load = True
+        if app.global_review:
+            self.reset_session()
+            app.show_popup("오류", "전체 복습 중에는 학습 범위를 바꿀 수 없습니다.")
+            return
+        if text == '범위':
+            self.show_range_popup()
+            return
+        self.apply_session(build_session_view(app.cards, text, scheduler=app.scheduler, seed=time.time_ns()))
+
+    def show_range_popup(self):
+        font_path = os.path.join(os.getcwd(), 'fonts', 'NanumGothic-Regular.ttf')
+        app = App.get_running_app()
+        content = BoxLayout(orientation='vertical')
+        start_input = TextInput(text='1', font_name=font_path, multiline=False, input_filter='int')
+        stop_input = TextInput(text=str(len(app.cards)), font_name=font_path, multiline=False, input_filter='int')
+        content.add_widget(start_input)
+        content.add_widget(stop_input)
+        popup = Popup(title='카드 번호 범위', content=content, size_hint=(0.7, 0.5))
+
+        def apply_range(instance):
+            popup.dismiss()
+            try:
+                start, stop = int(start_input.text), int(stop_input.text)
+            except ValueError:
+                app.show_popup("오류", "카드 번호를 입력하세요.")
+                return
+            self.apply_session(build_session_view(app.cards, '범위', start=start - 1, stop=stop))
+
+        content.add_widget(Button(text='확인', font_name=font_path, on_press=apply_range))
+        popup.open()
+
+    def apply_session(self, view):
+        self.session = view
+        self.session_index = 0
+        self.showing_front = True
+        if view is None:
+            self.session_index = self.current_card_index
+        elif view:
+            self.current_card_index = view[0]
         self.show_card()
 
     def show_card(self):
         app = App.get_running_app()
-        if app.cards:
+        if self.session is not None and not self.session:
+            self.card_label.text = "학습 범위에 카드가 없습니다."
+        elif app.cards:
             if 0 <= self.current_card_index < len(app.cards):
                 card = app.cards[self.current_card_index]
                 self.card_label.text = card['front'] if self.showing_front else card['back']
                 if not self.initial_load and self.tts_enabled:
                     self.play_current_card_tts(None)
+                if self.tts_enabled:
+                    self.prefetch_upcoming_cards()
             else:
                 self.card_label.text = "카드 인덱스가 범위를 벗어났습니다."
         else:
             self.card_label.text = "카드가 없습니다."
         self.initial_load = False
 
-    def prev_card(self, instance):
+    def update_card_label(self, *args):
         app = App.get_running_app()
-        if app.cards:
-            self.current_card_index = (self.current_card_index - 1) % len(app.cards)
+        if app.cards and 0 <= self.current_card_index < len(app.cards):
+            card = app.cards[self.current_card_index]
+            self.card_label.text = card['front'] if self.showing_front else card['back']
+
+    def prev_card(self, instance):
+        self.stop_drill()
+        if self.step_card(-1):
             self.showing_front = True
             self.show_card()
 
     def next_card(self, instance):
-        app = App.get_running_app()
-        if app.cards:
-            self.current_card_index = (self.current_card_index + 1) % len(app.cards)
+        self.stop_drill()
+        if self.step_card(1):
             self.showing_front = True
             self.show_card()
 
+    def grade_card(self, grade):
+        # 지금 카드의 복습 결과를 기록하고 다음으로 복습할 카드로 이동
+        self.stop_drill()
+        app = App.get_running_app()
+        if not app.cards or not self.view_positions():
+            return
+        app.review_card(self.current_card_index, grade)
+        if app.global_review:
+            self.show_next_global()
+            return
+        self.showing_front = True
+        if self.session is not None:
+            # 학습 범위를 정했으면 복습 일정 대신 범위 안의 다음 카드로
+            self.step_card(1)
+            self.show_card()
+            return
+        position = app.scheduler.next_due(app.cards)
+        if position is None:
+            self.card_label.text = "오늘 복습할 카드를 모두 마쳤습니다."
+            return
+        self.go_to_card(position)
+        self.show_card()
+
+    def show_next_global(self):
+        # 전체 복습: 다음 카드가 다른 단어장에 있으면 그 단어장을 열어서 보여 줌
+        app = App.get_running_app()
+        self.showing_front = True
+        while True:
+            item = app.global_review.next()
+            if item is None:
+                self.card_label.text = "오늘 복습할 카드를 모두 마쳤습니다."
+                return
+            deck_path, key, scheduler = item
+            if deck_path != app.current_deck:
+                app.current_deck = deck_path
+                app.load_cards()
+                app.update_deck_catalog(last_studied=int(time.time()))
+            position = scheduler.position_of(key, app.cards)
+            if position is not None:
+                self.go_to_card(position)
+                self.show_card()
+                return
+            scheduler.drop(key)  # 지워진 카드의 상태
+
     def flip_card(self, instance):
+        self.stop_drill()
         self.showing_front = not self.showing_front
         self.show_card()
 
+    def toggle_drill(self, instance):
+        if self.drill_active:
+            self.stop_drill()
+        else:
+            self.start_drill()
+
+    def start_drill(self):
+        app = App.get_running_app()
+        if not app.cards or not self.view_positions():
+            return
+        self.drill_active = True
+        self.drill_button.text = '자동 정지'
+        app.acquire_wake_lock()
+        self.play_drill_card()
+
+    def stop_drill(self):
+        if not self.drill_active:
+            return
+        self.drill_active = False
+        if self.drill_timer:
+            self.drill_timer.cancel()
+            self.drill_timer = None
+        self.drill_button.text = '자동 재생'
+        app = App.get_running_app()
+        app.tts_player.stop()
+        app.release_wake_lock()
+
+    def play_drill_card(self):
+        # 재생 스레드와 타이머에서도 호출되고 화면이 꺼져 있을 수 있으므로 Clock에 의존하지 않음
+        # (라벨 갱신만 Clock으로 넘김). 재생하는 동안 다음 카드는 미리 합성됨
+        app = App.get_running_app()
+        if not self.drill_active or not app.cards:
+            return
+        self.current_card_index %= len(app.cards)
+        card = app.cards[self.current_card_index]
+        self.showing_front = True
+        Clock.schedule_once(self.update_card_label)
+        self.prefetch_upcoming_cards()
+        app.tts_player.play([(card['front'], self.word_language, self.word_voice),
+                             (card['back'], self.meaning_language, self.meaning_voice)],
+                            pause=DRILL_SIDE_PAUSE, on_utterance=self.on_drill_utterance,
+                            on_complete=self.on_drill_card_done)
+
+    def on_drill_utterance(self, index):
+        if index == 1:
+            self.showing_front = False
+            Clock.schedule_once(self.update_card_label)
+
+    def on_drill_card_done(self):
+        if self.drill_active:
+            self.drill_timer = threading.Timer(DRILL_CARD_PAUSE, self.advance_drill)
+            self.drill_timer.daemon = True
+            self.drill_timer.start()
+
+    def advance_drill(self):
+        app = App.get_running_app()
+        if not self.drill_active or not app.cards or not self.step_card(1):
+            return
+        self.play_drill_card()
+
     def toggle_tts(self, instance):
         self.tts_enabled = not self.tts_enabled
         self.tts_toggle_button.text = 'TTS 켜기' if not self.tts_enabled else 'TTS 끄기'
 
     def go_back(self, instance):
+        App.get_running_app().global_review = None
         self.manager.current = 'main'
 
     def edit_card(self, instance):
+        self.stop_drill()
         app = App.get_running_app()
-        if not app.cards:
+        if not app.cards or not self.view_positions():
             return
         font_path = os.path.join(os.getcwd(), 'fonts', 'NanumGothic-Regular.ttf')
         self.layout.clear_widgets()
@@ -565,12 +3018,11 @@ class FlashcardScreen(Screen):
         front = self.front_input.text.strip()
         back = self.back_input.text.strip()
         if front and back:
-            app.cards[self.current_card_index]['front'] = front
-            app.cards[self.current_card_index]['back'] = back
-            app.save_cards()
+            app.update_card(self.current_card_index, front=front, back=back)
             self.layout.clear_widgets()
             self.layout.add_widget(self.first_row_layout)
             self.layout.add_widget(self.second_row_layout)
+            self.layout.add_widget(self.grade_layout)
             self.layout.add_widget(self.card_label)
             self.layout.add_widget(self.options_layout)
             self.show_card()
@@ -579,19 +3031,79 @@ class FlashcardScreen(Screen):
         self.layout.clear_widgets()
         self.layout.add_widget(self.first_row_layout)
         self.layout.add_widget(self.second_row_layout)
+        self.layout.add_widget(self.grade_layout)
         self.layout.add_widget(self.card_label)
         self.layout.add_widget(self.options_layout)
         self.show_card()
 
     def delete_card(self, instance):
+        self.stop_drill()
         app = App.get_running_app()
-        if app.cards:
-            app.cards.pop(self.current_card_index)
-            app.save_cards()
-            if self.current_card_index >= len(app.cards):
+        if app.cards and self.view_positions():
+            app.delete_card(self.current_card_index)
+            if self.session is not None:
+                self.session = remove_session_position(self.session, self.current_card_index)
+                if self.session:
+                    self.session_index %= len(self.session)
+                    self.current_card_index = self.session[self.session_index]
+            elif self.current_card_index >= len(app.cards):
                 self.current_card_index = len(app.cards) - 1 if app.cards else 0
+                self.session_index = self.current_card_index
             self.show_card()
 
+# 엑셀 모드 표의 최소 줄 높이 (화면에 보이는 줄만 위젯으로 만들어 재사용, 긴 글은 줄을 바꿔 높이를 늘림)
+EXCEL_ROW_HEIGHT = 60
+# 엑셀 모드에서 단어와 의미를 이어서 읽을 때 사이의 쉬는 시간 (초)
+EXCEL_SPEECH_PAUSE = 1.5
+
+class CardRow(RecycleDataViewBehavior, BoxLayout):
+    """ExcelScreen 표의 한 줄 (번호/단어/의미). 스크롤할 때 다른 카드의 줄로 재사용됨"""
+    def __init__(self, **kwargs):
+        super().__init__(orientation='horizontal', spacing=10, **kwargs)
+        font_path = os.path.join(os.getcwd(), 'fonts', 'NanumGothic-Regular.ttf')
+        self.screen = None
+        self.index = 0
+        self.number_label = Label(font_name=font_path, size_hint_x=0.1)
+        self.front_label = Label(font_name=font_path, size_hint_x=0.45, halign='center', valign='middle')
+        self.back_label = Label(font_name=font_path, size_hint_x=0.45, halign='center', valign='middle')
+        for label, side in ((self.number_label, 'number'), (self.front_label, 'front'), (self.back_label, 'back')):
+            label.card_index = 0
+            label.card_side = side
+            label.bind(on_touch_down=self.on_cell_touch)
+            self.add_widget(label)
+        for label in (self.front_label, self.back_label):
+            label.bind(size=self.update_label_text_size)
+            label.bind(texture_size=self.update_row_height)
+
+    def update_label_text_size(self, instance, size):
+        instance.text_size = (size[0], None)
+
+    def update_row_height(self, instance, size):
+        # 줄을 바꾼 글의 높이에 맞춰 이 줄의 높이를 줄 데이터에 기록 (RecycleView가 줄 위치를 다시 계산)
+        if self.screen is None:
+            return
+        height = max(EXCEL_ROW_HEIGHT, self.front_label.texture_size[1], self.back_label.texture_size[1])
+        data = self.screen.rv.data
+        if self.index < len(data) and data[self.index].get('height', EXCEL_ROW_HEIGHT) != height:
+            self.screen.update_row(self.index, height=height)
+
+    def refresh_view_attrs(self, rv, index, data):
+        # 카드 내용은 app.cards에서 읽고, 줄 데이터에는 숨김 상태만 둔다
+        self.screen = rv.screen
+        self.index = index
+        card = App.get_running_app().cards[index]
+        for label in (self.number_label, self.front_label, self.back_label):
+            label.card_index = index
+            label.font_size = self.screen.font_size
+        self.number_label.text = str(index + 1)
+        self.front_label.text = '-' if data['front_hidden'] else card['front']
+        self.back_label.text = '-' if data['back_hidden'] else card['back']
+        return super().refresh_view_attrs(rv, index, data)
+
+    def on_cell_touch(self, instance, touch):
+        if self.screen:
+            self.screen.on_cell_touch(instance, touch)
+
 class ExcelScreen(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -599,24 +3111,28 @@ class ExcelScreen(Screen):
         self.font_size = 22
         self.app_dir = get_app_directory()
         self.layout = BoxLayout(orientation='vertical')
-        self.grid = GridLayout(cols=3, spacing=10, size_hint_y=None)
-        self.grid.bind(minimum_height=self.grid.setter('height'))
-        self.scroll = ScrollView(size_hint=(1, 1))
-        self.scroll.add_widget(self.grid)
-        self.layout.add_widget(self.scroll)
-        self.current_sound = None
-        self.stop_tts_event = threading.Event()
+        self.header_layout = BoxLayout(orientation='horizontal', spacing=10, size_hint_y=None, height=40)
+        self.header_layout.add_widget(Label(text='번호', font_name=font_path, size_hint_x=0.1, font_size=self.font_size))
+        word_header = Label(text='단어', font_name=font_path, size_hint_x=0.45, font_size=self.font_size)
+        word_header.bind(on_touch_down=self.toggle_words_visibility)
+        self.header_layout.add_widget(word_header)
+        meaning_header = Label(text='의미', font_name=font_path, size_hint_x=0.45, font_size=self.font_size)
+        meaning_header.bind(on_touch_down=self.toggle_meanings_visibility)
+        self.header_layout.add_widget(meaning_header)
+        self.layout.add_widget(self.header_layout)
+        self.rv = RecycleView(size_hint=(1, 1))
+        self.rv.screen = self
+        self.rv.viewclass = CardRow
+        rows = RecycleBoxLayout(orientation='vertical', spacing=10, size_hint_y=None,
+                                default_size=(None, EXCEL_ROW_HEIGHT), default_size_hint=(1, None))
+        rows.bind(minimum_height=rows.setter('height'))
+        self.rv.add_widget(rows)
+        self.layout.add_widget(self.rv)
         self.tts_enabled = True
         self.words_hidden = False
         self.meanings_hidden = False
 
-        self.voice_options = {
-            "ko-KR": ["ko-KR-Neural2-A", "ko-KR-Neural2-B", "ko-KR-Neural2-C"],
-            "en-US": ["en-US-Neural2-A", "en-US-Standard-B", "en-US-Neural2-C"],
-            "fr-FR": ["fr-FR-Standard-A", "fr-FR-Standard-B", "fr-FR-Standard-C"],
-            "es-ES": ["es-ES-Standard-A", "es-ES-Standard-B"],
-            "de-DE": ["de-DE-Standard-A", "de-DE-Standard-B"]
-        }
+        self.voice_options = VOICE_OPTIONS
         self.word_language = "en-US"
         self.meaning_language = "ko-KR"
         self.word_voice = self.voice_options["en-US"][0]
@@ -651,47 +3167,21 @@ class ExcelScreen(Screen):
         self.manager.current = 'main'
 
     def load_cards(self):
-        font_path = os.path.join(os.getcwd(), 'fonts', 'NanumGothic-Regular.ttf')
-        self.grid.clear_widgets()
-        self.grid.add_widget(Label(text='번호', font_name=font_path, size_hint_y=None, height=40, size_hint_x=0.1, font_size=self.font_size))
-        word_header = Label(text='단어', font_name=font_path, size_hint_y=None, height=40, size_hint_x=0.45, font_size=self.font_size)
-        word_header.bind(on_touch_down=self.toggle_words_visibility)
-        self.grid.add_widget(word_header)
-        meaning_header = Label(text='의미', font_name=font_path, size_hint_y=None, height=40, size_hint_x=0.45, font_size=self.font_size)
-        meaning_header.bind(on_touch_down=self.toggle_meanings_visibility)
-        self.grid.add_widget(meaning_header)
-
         app = App.get_running_app()
-        for index, card in enumerate(app.cards):
-            number_label = Label(text=str(index + 1), font_name=font_path, size_hint_y=None, height=40, size_hint_x=0.1, font_size=self.font_size)
-            number_label.card_index = index
-            number_label.card_side = 'number'
-            number_label.bind(on_touch_down=self.on_cell_touch)
-            front_label = Label(text=card['front'], font_name=font_path, size_hint_y=None, size_hint_x=0.45, font_size=self.font_size)
-            front_label.bind(size=self.update_label_text_size)
-            front_label.bind(texture_size=self.update_label_height)
-            front_label.card_index = index
-            front_label.card_side = 'front'
-            front_label.bind(on_touch_down=self.on_cell_touch)
-            back_label = Label(text=card['back'], font_name=font_path, size_hint_y=None, size_hint_x=0.45, font_size=self.font_size)
-            back_label.bind(size=self.update_label_text_size)
-            back_label.bind(texture_size=self.update_label_height)
-            back_label.card_index = index
-            back_label.card_side = 'back'
-            back_label.bind(on_touch_down=self.on_cell_touch)
-            self.grid.add_widget(number_label)
-            self.grid.add_widget(front_label)
-            self.grid.add_widget(back_label)
+        # 모든 줄이 같은 기본 dict를 가리키고, 따로 바뀐 줄만 자기 dict를 가짐
+        row = {'front_hidden': self.words_hidden, 'back_hidden': self.meanings_hidden}
+        self.rv.data = [row] * len(app.cards)
 
     def on_cell_touch(self, instance, touch):
         if instance.collide_point(*touch.pos):
             app = App.get_running_app()
             card = app.cards[instance.card_index]
             if instance.card_side in ['front', 'back']:
-                instance.text = '-' if instance.text != '-' else card[instance.card_side]
+                key = instance.card_side + '_hidden'
+                self.update_row(instance.card_index, **{key: not self.rv.data[instance.card_index][key]})
             if self.tts_enabled:
-                if self.current_sound and self.current_sound.state == 'play':
-                    self.current_sound.stop()
+                if app.tts_player.is_busy():
+                    app.tts_player.stop()
                 else:
                     if instance.card_side == 'number':
                         self.synthesize_speech(word=card['front'], word_lang=self.word_language, word_voice=self.word_voice,
@@ -703,133 +3193,34 @@ class ExcelScreen(Screen):
             if touch.is_double_tap:
                 self.show_context_menu(instance.card_index)
 
-    def update_label_text_size(self, instance, size):
-        instance.text_size = (size[0], None)
+    def update_row(self, index, **changes):
+        # 한 줄의 데이터만 바꿔서 그 줄(화면에 보이는 경우)만 다시 그림
+        row = dict(self.rv.data[index])
+        row.update(changes)
+        self.rv.data[index] = row
 
-    def update_label_height(self, instance, size):
-        instance.height = size[1]
+    def remove_row(self, index):
+        # 뒤쪽 줄의 번호는 저장하지 않고 다시 그려질 때 위치로 계산하므로, 보이는 줄만 갱신됨
+        del self.rv.data[index]
 
     def toggle_words_visibility(self, instance, touch):
         if instance.collide_point(*touch.pos):
             self.words_hidden = not self.words_hidden
-            app = App.get_running_app()
-            for i in range(1, len(self.grid.children) - 2, 3):
-                child = self.grid.children[i]
-                if isinstance(child, Label) and hasattr(child, 'card_index'):
-                    child.text = '-' if self.words_hidden else app.cards[child.card_index]['front']
+            self.load_cards()
 
     def toggle_meanings_visibility(self, instance, touch):
         if instance.collide_point(*touch.pos):
             self.meanings_hidden = not self.meanings_hidden
-            app = App.get_running_app()
-            for i in range(0, len(self.grid.children) - 2, 3):
-                child = self.grid.children[i]
-                if isinstance(child, Label) and hasattr(child, 'card_index'):
-                    child.text = '-' if self.meanings_hidden else app.cards[child.card_index]['back']
+            self.load_cards()
 
     def synthesize_speech(self, word=None, word_lang=None, word_voice=None, meaning=None, meaning_lang=None, meaning_voice=None):
-        app = App.get_running_app()
-        if self.current_sound and self.current_sound.state == 'play':
-            self.current_sound.stop()
-        self.stop_tts_event.clear()
-
-        def play_tts_sequence():
-            try:
-                if platform == 'android' and app.tts_engine:
-                    if word and meaning:
-                        locale = Locale('ko', 'KR') if word_lang == 'ko-KR' else Locale('en', 'US')
-                        app.tts_engine.setLanguage(locale)
-                        app.tts_engine.speak(word, TextToSpeech.QUEUE_FLUSH, None)
-                        time.sleep(1.5)
-                        locale = Locale('ko', 'KR') if meaning_lang == 'ko-KR' else Locale('en', 'US')
-                        app.tts_engine.setLanguage(locale)
-                        app.tts_engine.speak(meaning, TextToSpeech.QUEUE_FLUSH, None)
-                    elif word:
-                        locale = Locale('ko', 'KR') if word_lang == 'ko-KR' else Locale('en', 'US')
-                        app.tts_engine.setLanguage(locale)
-                        app.tts_engine.speak(word, TextToSpeech.QUEUE_FLUSH, None)
-                    elif meaning:
-                        locale = Locale('ko', 'KR') if meaning_lang == 'ko-KR' else Locale('en', 'US')
-                        app.tts_engine.setLanguage(locale)
-                        app.tts_engine.speak(meaning, TextToSpeech.QUEUE_FLUSH, None)
-                elif app.tts_client:
-                    if word and meaning:
-                        self.play_tts(word, word_lang, word_voice)
-                        time.sleep(1.5)
-                        self.play_tts(meaning, meaning_lang, meaning_voice)
-                    elif word:
-                        self.play_tts(word, word_lang, word_voice)
-                    elif meaning:
-                        self.play_tts(meaning, meaning_lang, meaning_voice)
-                else:
-                    if word and meaning:
-                        tts = gTTS(text=word, lang=word_lang[:2])
-                        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as temp_file:
-                            tts.save(temp_file.name)
-                            self.current_sound = SoundLoader.load(temp_file.name)
-                            self.current_sound.play()
-                            while self.current_sound.state == 'play' and not self.stop_tts_event.is_set():
-                                time.sleep(0.1)
-                            os.unlink(temp_file.name)
-                        tts = gTTS(text=meaning, lang=meaning_lang[:2])
-                        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as temp_file:
-                            tts.save(temp_file.name)
-                            self.current_sound = SoundLoader.load(temp_file.name)
-                            self.current_sound.play()
-                            while self.current_sound.state == 'play' and not self.stop_tts_event.is_set():
-                                time.sleep(0.1)
-                            os.unlink(temp_file.name)
-                    elif word:
-                        tts = gTTS(text=word, lang=word_lang[:2])
-                        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as temp_file:
-                            tts.save(temp_file.name)
-                            self.current_sound = SoundLoader.load(temp_file.name)
-                            self.current_sound.play()
-                            while self.current_sound.state == 'play' and not self.stop_tts_event.is_set():
-                                time.sleep(0.1)
-                            os.unlink(temp_file.name)
-                    elif meaning:
-                        tts = gTTS(text=meaning, lang=meaning_lang[:2])
-                        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as temp_file:
-                            tts.save(temp_file.name)
-                            self.current_sound = SoundLoader.load(temp_file.name)
-                            self.current_sound.play()
-                            while self.current_sound.state == 'play' and not self.stop_tts_event.is_set():
-                                time.sleep(0.1)
-                            os.unlink(temp_file.name)
-            except Exception as e:
-                print(f"TTS 재생 중 오류 발생: {e}")
-            finally:
-                self.current_sound = None
-
-        threading.Thread(target=play_tts_sequence).start()
-
-    def play_tts(self, text, language, voice):
-        app = App.get_running_app()
-        try:
-            synthesis_input = texttospeech.SynthesisInput(text=text)
-            voice_params = texttospeech.VoiceSelectionParams(language_code=language, name=voice)
-            audio_config = texttospeech.AudioConfig(audio_encoding=texttospeech.AudioEncoding.MP3)
-            response = app.tts_client.synthesize_speech(input=synthesis_input, voice=voice_params, audio_config=audio_config)
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as temp_file:
-                temp_file.write(response.audio_content)
-                temp_file_name = temp_file.name
-            self.current_sound = SoundLoader.load(temp_file_name)
-            if self.current_sound:
-                self.current_sound.play()
-                while self.current_sound.state == 'play' and not self.stop_tts_event.is_set():
-                    time.sleep(0.1)
-        except Exception as e:
-            print(f"TTS 재생 오류: {e}")
-        finally:
-            if self.current_sound:
-                self.current_sound.stop()
-                self.current_sound = None
-            if 'temp_file_name' in locals() and os.path.exists(temp_file_name):
-                try:
-                    os.unlink(temp_file_name)
-                except Exception as e:
-                    print(f"파일 삭제 오류: {e}")
+        utterances = []
+        if word:
+            utterances.append((word, word_lang, word_voice))
+        if meaning:
+            utterances.append((meaning, meaning_lang, meaning_voice))
+        # 단어와 의미를 함께 읽을 때는 두 요청을 한 클립으로 합성해 지연을 줄임
+        App.get_running_app().tts_player.play(utterances, pause=EXCEL_SPEECH_PAUSE, combine=len(utterances) > 1)
 
     def show_context_menu(self, index):
         font_path = os.path.join(os.getcwd(), 'fonts', 'NanumGothic-Regular.ttf')
@@ -856,16 +3247,16 @@ class ExcelScreen(Screen):
 
     def save_edited_card(self, index, front, back):
         app = App.get_running_app()
-        app.cards[index]['front'] = front.strip()
-        app.cards[index]['back'] = back.strip()
-        app.save_cards()
-        self.load_cards()
+        app.update_card(index, front=front.strip(), back=back.strip())
+        self.update_row(index)
 
     def delete_card(self, index):
         app = App.get_running_app()
-        app.cards.pop(index)
-        app.save_cards()
-        self.load_cards()
+        app.delete_card(index)
+        self.remove_row(index)
+        if self.context_menu:
+            self.context_menu.dismiss()
+            self.context_menu = None
 
     def on_word_language_select(self, spinner, text):
         self.word_language = text
@@ -889,6 +3280,403 @@ class ExcelScreen(Screen):
         self.tts_enabled = not self.tts_enabled
         self.tts_toggle_button.text = 'TTS 켜기' if not self.tts_enabled else 'TTS 끄기'
 
+# 검색 결과 화면에서 카드 내용을 읽으려고 열어 둘 단어장 수
+SEARCH_DECK_CACHE_SIZE = 8
+
+class SearchResultRow(RecycleDataViewBehavior, Button):
+    """검색 결과 한 줄 (단어 - 의미 [단어장]). 누르면 그 카드로 이동"""
+    def __init__(self, **kwargs):
+        super().__init__(font_name=os.path.join(os.getcwd(), 'fonts', 'NanumGothic-Regular.ttf'),
+                         halign='left', valign='middle', shorten=True, **kwargs)
+        self.screen = None
+        self.deck_path = None
+        self.position = 0
+        self.bind(size=self.update_text_size)
+
+    def update_text_size(self, instance, size):
+        self.text_size = (size[0] - 20, size[1])
+
+    def refresh_view_attrs(self, rv, index, data):
+        # 카드 내용은 보이는 줄에 대해서만 단어장에서 읽음
+        self.screen = rv.screen
+        self.deck_path = data['deck']
+        self.position = data['position']
+        card = self.screen.card_at(self.deck_path, self.position)
+        self.text = f"{card['front']} - {card['back']}  [{self.deck_path}]" if card else f"[{self.deck_path}]"
+        return super().refresh_view_attrs(rv, index, data)
+
+    def on_press(self):
+        if self.screen:
+            self.screen.open_result(self.deck_path, self.position)
+
+class SearchScreen(Screen):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        font_path = os.path.join(os.getcwd(), 'fonts', 'NanumGothic-Regular.ttf')
+        self.deck_cards = OrderedDict()
+        self.retry_event = None  # 색인이 준비될 때까지 다시 검색하도록 예약한 이벤트
+        layout = BoxLayout(orientation='vertical')
+        top_layout = BoxLayout(orientation='horizontal', size_hint_y=None, height=50)
+        self.query_input = TextInput(hint_text='검색할 단어 (앞부분만 입력해도 됨)', font_name=font_path, multiline=False, size_hint_x=0.8)
+        self.search_trigger = Clock.create_trigger(self.run_search, 0.15)
+        self.query_input.bind(text=lambda instance, text: self.search_trigger())
+        top_layout.add_widget(self.query_input)
+        top_layout.add_widget(Button(text='뒤로', font_name=font_path, size_hint_x=0.2, on_press=self.go_back))
+        layout.add_widget(top_layout)
+        self.status_label = Label(text='', font_name=font_path, size_hint_y=None, height=30)
+        layout.add_widget(self.status_label)
+        self.rv = RecycleView(size_hint=(1, 1))
+        self.rv.screen = self
+        self.rv.viewclass = SearchResultRow
+        rows = RecycleBoxLayout(orientation='vertical', spacing=2, size_hint_y=None,
+                                default_size=(None, 50), default_size_hint=(1, None))
+        rows.bind(minimum_height=rows.setter('height'))
+        self.rv.add_widget(rows)
+        layout.add_widget(self.rv)
+        self.add_widget(layout)
+
+    def on_enter(self):
+        self.deck_cards.clear()
+        self.run_search()
+
+    def on_leave(self):
+        self.cancel_retry()
+
+    def cancel_retry(self):
+        if self.retry_event is not None:
+            self.retry_event.cancel()
+            self.retry_event = None
+
+    def run_search(self, *args):
+        app = App.get_running_app()
+        self.cancel_retry()
+        query = self.query_input.text.strip()
+        if not query:
+            self.rv.data = []
+            self.status_label.text = ''
+            return
+        if app.search_index.error is not None:
+            self.rv.data = []
+            self.status_label.text = f'검색 색인을 불러오지 못했습니다: {app.search_index.error}'
+            return
+        if not app.search_index.ready:
+            self.status_label.text = '검색 색인을 준비하는 중입니다...'
+            self.retry_event = Clock.schedule_once(self.run_search, 0.5)
+            return
+        started = time.time()
+        hits = app.search_index.search(query)
+        elapsed_ms = (time.time() - started) * 1000
+        self.rv.data = [{'deck': deck_path, 'position': position} for deck_path, position in hits]
+        self.status_label.text = f"검색 결과 {len(hits)}개 ({elapsed_ms:.0f} ms)"
+
+    def card_at(self, deck_path, position):
+        app = App.get_running_app()
+        if deck_path == app.current_deck:
+            cards = app.cards
+        else:
+            cards = self.deck_cards.get(deck_path)
+            if cards is None:
+                try:
+                    cards = open_deck_store(os.path.join(app.app_dir, 'decks', deck_path)).open_cards()
+                except (OSError, ValueError):
+                    cards = ListCardSource()
+                self.deck_cards[deck_path] = cards
+                while len(self.deck_cards) > SEARCH_DECK_CACHE_SIZE:
+                    self.deck_cards.popitem(last=False)
+            else:
+                self.deck_cards.move_to_end(deck_path)
+        return cards[position] if 0 <= position < len(cards) else None
+
+    def open_result(self, deck_path, position):
+        app = App.get_running_app()
+        if deck_path != app.current_deck:
+            app.current_deck = deck_path
+            app.load_cards()
+        self.manager.get_screen('flashcard').start_card_index = position
+        self.manager.current = 'flashcard'
+
+    def go_back(self, instance):
+        self.manager.current = 'main'
+
+# 파일 불러오기: 읽는 단위(바이트), 한 번에 쓰는 카드 수, 알려 줄 잘못된 줄 수
+IMPORT_READ_SIZE = 64 * 1024
+IMPORT_CHUNK_SIZE = 500
+IMPORT_MAX_REPORTED_ERRORS = 20
+IMPORT_MAX_ITEM_SIZE = 1024 * 1024  # 이보다 길게 읽어도 해석되지 않는 JSON 항목은 잘못된 항목으로 건너뜀
+
+class DeckImportError(Exception):
+    pass
+
+# 한 줄을 앞면/뒷면으로 나누는 구분자 (앞에 있는 것부터 시도: 탭, 공백으로 둘러싼 -, /, 그리고 -, /, ,)
+# 앞에서부터 시도: 탭, 띄어 쓴 - 와 /, 쉼표, 붙여 쓴 -와 / (e-mail,메일처럼 단어 안의 -보다 쉼표를 먼저 봄)
+CARD_LINE_PATTERNS = [
+    re.compile(r'^([^\t]*)\t([^\t]*)'),
+    re.compile(r'^(.+?)\s+[-/]\s+(.+)$'),
+    re.compile(r'^(.+?),(.+)$'),
+    re.compile(r'^(.+?)-(.+)$'),
+    re.compile(r'^(.+?)/(.+)$'),
+]
+# Anki 텍스트 내보내기 머리줄 (#separator:tab, #html:true, #guid column:1 등)
+ANKI_HEADER_PATTERN = re.compile(r'^#([a-z ]+):(.*)$')
+ANKI_SEPARATORS = {'tab': '\t', 'comma': ',', 'semicolon': ';', 'space': ' ', 'pipe': '|', 'colon': ':'}
+ANKI_META_COLUMNS = ('guid column', 'notetype column', 'deck column', 'tags column')
+HTML_TAG_PATTERN = re.compile(r'<[^>]*>')
+
+def make_card(fields, skip_columns=(), strip_html=False):
+    # 메타데이터 열을 뺀 앞의 두 칸을 앞면/뒷면으로 사용
+    values = [value for column, value in enumerate(fields) if column not in skip_columns]
+    if len(values) < 2:
+        return None
+    if strip_html:
+        values = [html.unescape(HTML_TAG_PATTERN.sub('', value)) for value in values[:2]]
+    front, back = values[0].strip(), values[1].strip()
+    if not front or not back:
+        return None
+    return {'front': front, 'back': back, 'starred': False}
+
+def parse_card_lines(lines, file_format='text'):
+    """줄을 하나씩 받아 (줄 번호, 카드 또는 None, 원문)을 돌려주는 생성기 (None은 잘못된 줄).
+
+    file_format은 'text'(탭, 쉼표, -, / 구분), 'tsv'(탭 구분, Anki 내보내기 포함), 'csv'(따옴표 처리 포함).
+    일괄 추가와 파일 불러오기가 함께 사용한다.
+    """
+    if file_format == 'csv':
+        reader = csv.reader(line.lstrip('\ufeff') for line in lines)
+        for fields in reader:
+            if any(field.strip() for field in fields):
+                yield reader.line_num, make_card(fields), ','.join(fields)
+        return
+    separator = '\t' if file_format == 'tsv' else None
+    skip_columns = set()
+    strip_html = False
+    in_header = True
+    for line_number, raw in enumerate(lines, 1):
+        line = raw.rstrip('\r\n')
+        if line_number == 1:
+            line = line.lstrip('\ufeff')
+        if not line.strip():
+            continue
+        header = ANKI_HEADER_PATTERN.match(line) if in_header else None
+        if header:
+            key, value = header.group(1), header.group(2).strip()
+            if key == 'separator':
+                separator = ANKI_SEPARATORS.get(value.lower(), value)
+            elif key == 'html':
+                strip_html = value == 'true'
+            elif key in ANKI_META_COLUMNS and value.isdigit():
+                skip_columns.add(int(value) - 1)
+            continue
+        in_header = False
+        if separator:
+            yield line_number, make_card(line.split(separator), skip_columns, strip_html), line
+            continue
+        for pattern in CARD_LINE_PATTERNS:
+            match = pattern.match(line)
+            if match:
+                yield line_number, make_card(match.groups()), line
+                break
+        else:
+            yield line_number, None, line
+
+def iter_text_cards(f, progress=None, file_format='text'):
+    """텍스트 파일을 한 줄씩 읽어 parse_card_lines로 넘김"""
+    def lines():
+        read_bytes = 0
+        for raw in f:
+            read_bytes += len(raw)
+            if progress:
+                progress(read_bytes)
+            yield raw.decode('utf-8', errors='replace')
+    return parse_card_lines(lines(), file_format)
+
+def iter_json_cards(f, progress=None):
+    """JSON 배열을 조금씩 읽으며 항목 하나씩 (번호, 카드 또는 None, 원문)을 돌려줌.
+
+    형식이 잘못된 항목은 None으로 돌려주고 다음 최상위 쉼표까지 건너뛰므로, 파일 나머지를 메모리에 쌓지 않는다.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    buffer = ''
+    pos = 0
+    read_bytes = 0
+    eof = False
+    state = 'start'  # start: '[' 앞, first: 첫 항목 또는 ']', item: 쉼표 뒤 항목, separator: 항목 뒤 ',' 또는 ']'
+    item_number = 0
+
+    def fill():
+        nonlocal buffer, pos, read_bytes, eof
+        chunk = f.read(IMPORT_READ_SIZE)
+        read_bytes += len(chunk)
+        if progress:
+            progress(read_bytes)
+        if not chunk:
+            eof = True
+        buffer = buffer[pos:] + text_decoder.decode(chunk, final=eof)
+        pos = 0
+
+    def skip_item():
+        # 잘못된 항목을 다음 최상위 ',' 또는 ']'까지 건너뜀 (읽은 부분은 바로 버림)
+        nonlocal pos, state
+        depth = 0
+        in_string = False
+        escaped = False
+        while True:
+            while pos < len(buffer):
+                char = buffer[pos]
+                if in_string:
+                    if escaped:
+                        escaped = False
+                    elif char == '\\':
+                        escaped = True
+                    elif char == '"':
+                        in_string = False
+                elif char == '"':
+                    in_string = True
+                elif char in '[{':
+                    depth += 1
+                elif char in ']}':
+                    if depth == 0 and char == ']':
+                        state = 'separator'
+                        return
+                    depth = max(depth - 1, 0)
+                elif char == ',' and depth == 0:
+                    pos += 1
+                    state = 'item'
+                    return
+                pos += 1
+            if eof:
+                raise DeckImportError("JSON 배열이 끝나지 않았습니다.")
+            fill()
+
+    while True:
+        while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] == '\ufeff'):
+            pos += 1
+        if pos >= len(buffer):
+            if eof:
+                raise DeckImportError("JSON 배열이 끝나지 않았습니다.")
+            fill()
+            continue
+        char = buffer[pos]
+        if state == 'start':
+            if char != '[':
+                raise DeckImportError("JSON 파일은 카드 배열이어야 합니다.")
+            state = 'first'
+            pos += 1
+            continue
+        if char == ']':
+            return
+        if state == 'separator':
+            if char == ',':
+                state = 'item'
+                pos += 1
+                continue
+            # 항목 사이에 쉼표가 없음: 이어지는 항목을 잘못된 항목으로 보고 건너뜀
+            item_number += 1
+            yield item_number, None, buffer[pos:pos + 80]
+            skip_item()
+            continue
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if not eof and len(buffer) - pos < IMPORT_MAX_ITEM_SIZE:
+                fill()  # 항목이 읽은 부분에서 잘렸을 수 있으므로 더 읽은 뒤 다시 해석
+                continue
+            item_number += 1
+            yield item_number, None, buffer[pos:pos + 80]
+            skip_item()
+            continue
+        if end >= len(buffer) and not eof:
+            # 숫자처럼 끝이 잘렸을 수 있는 값은 더 읽은 뒤 다시 해석
+            fill()
+            continue
+        item_number += 1
+        source = buffer[pos:end]
+        pos = end
+        state = 'separator'
+        if isinstance(value, dict) and isinstance(value.get('front'), str) and isinstance(value.get('back'), str):
+            value.setdefault('starred', False)
+            yield item_number, value, source
+        else:
+            yield item_number, None, source
+
+def import_cards_file(source_path, deck_dir, progress=None):
+    """파일을 읽어 deck_dir의 flashcards.json으로 저장하고 (추가한 카드 수, 중복 카드 수, 잘못된 줄 수, 잘못된 줄 목록)을 반환.
+
+    이미 있는 단어장이면 기존 카드 뒤에 없는 카드만 덧붙인다 (카드 해시 색인으로 확인).
+    카드를 IMPORT_CHUNK_SIZE개씩 임시 파일에 써 나가다가 끝나면 교체하므로, 불러오는 파일 전체를 메모리에 올리지 않는다.
+    progress(읽은 바이트, 전체 바이트)는 불러오는 스레드에서 호출된다.
+    """
+    extension = os.path.splitext(source_path)[1].lower()
+    if extension == '.json':
+        reader = iter_json_cards
+    elif extension in ('.txt', '.tsv', '.csv'):
+        file_format = {'.txt': 'text', '.tsv': 'tsv', '.csv': 'csv'}[extension]
+        reader = lambda src, report: iter_text_cards(src, report, file_format)
+    else:
+        raise DeckImportError("지원하지 않는 파일 형식입니다.")
+    total_bytes = os.path.getsize(source_path)
+    report = (lambda read_bytes: progress(read_bytes, total_bytes)) if progress else None
+    os.makedirs(deck_dir, exist_ok=True)
+    snapshot_path = os.path.join(deck_dir, DECK_SNAPSHOT_NAME)
+    tmp_path = snapshot_path + '.import'
+    store = open_deck_store(deck_dir)
+    existing = store.load()
+    index = CardIndex.build(existing)
+    snapshot_hash = hashlib.sha1()
+    written = 0
+    count = 0
+    duplicate_count = 0
+    bad_count = 0
+    bad_lines = []
+
+    def write_chunk(out, chunk):
+        nonlocal written
+        data = ((',\n' if written else '\n') + ',\n'.join(chunk)).encode('utf-8')
+        out.write(data)
+        snapshot_hash.update(data)
+        written += len(chunk)
+
+    try:
+        with open(source_path, 'rb') as src, open(tmp_path, 'wb') as out:
+            out.write(b'[')
+            snapshot_hash.update(b'[')
+            for start in range(0, len(existing), IMPORT_CHUNK_SIZE):
+                write_chunk(out, [json.dumps(card, ensure_ascii=False, default=card_json_default)
+                                  for card in existing[start:start + IMPORT_CHUNK_SIZE]])
+            existing = None
+            chunk = []
+            for number, card, source in reader(src, report):
+                if card is None:
+                    bad_count += 1
+                    if len(bad_lines) < IMPORT_MAX_REPORTED_ERRORS:
+                        bad_lines.append((number, source[:80]))
+                    continue
+                if index.contains(card):
+                    duplicate_count += 1
+                    continue
+                index.add(card)
+                chunk.append(json.dumps(card, ensure_ascii=False))
+                count += 1
+                if len(chunk) >= IMPORT_CHUNK_SIZE:
+                    write_chunk(out, chunk)
+                    chunk = []
+            if chunk:
+                write_chunk(out, chunk)
+            out.write(b'\n]\n')
+            snapshot_hash.update(b'\n]\n')
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_path, snapshot_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+    # 이전 카드에 대한 저널은 새 스냅샷에 이미 합쳐졌으므로 삭제
+    journal_path = os.path.join(deck_dir, DECK_JOURNAL_NAME)
+    if os.path.exists(journal_path):
+        os.unlink(journal_path)
+    index.write(os.path.join(deck_dir, DECK_INDEX_NAME), snapshot_hash.hexdigest())
+    return count, duplicate_count, bad_count, bad_lines
+
 class DeckSelectionScreen(Screen):
     def __init__(self, app_dir=None, **kwargs):
         super().__init__(**kwargs)
@@ -926,7 +3714,7 @@ class DeckSelectionScreen(Screen):
             os.makedirs(deck_dir, exist_ok=True)
             print(f"데크 디렉토리 생성: {deck_dir}")
         
-        deck_titles = [d for d in os.listdir(deck_dir) if os.path.isdir(os.path.join(deck_dir, d))]
+        deck_titles = App.get_running_app().deck_catalog.title_names()
         print(f"불러온 단어장 목록: {deck_titles}")
         
         if not deck_titles:
@@ -952,6 +3740,7 @@ class DeckSelectionScreen(Screen):
         try:
             if not os.path.exists(title_dir):
                 os.makedirs(title_dir, exist_ok=True)
+                App.get_running_app().deck_catalog.add_title(title_name)
                 print(f"단어장 디렉토리 생성 성공: {title_dir}")
                 self.new_title_input.text = ''
                 self.load_decks()
@@ -965,7 +3754,7 @@ class DeckSelectionScreen(Screen):
     def open_file_chooser(self, instance):
         font_path = os.path.join(os.getcwd(), 'fonts', 'NanumGothic-Regular.ttf')
         content = BoxLayout(orientation='vertical')
-        self.file_chooser = FileChooserListView(path=os.getcwd(), filters=['*.json', '*.txt'])
+        self.file_chooser = FileChooserListView(path=os.getcwd(), filters=['*.json', '*.txt', '*.tsv', '*.csv'])
         content.add_widget(self.file_chooser)
         content.add_widget(Button(text='불러오기', font_name=font_path, on_press=self.import_deck))
         content.add_widget(Button(text='취소', font_name=font_path, on_press=lambda x: self.file_popup.dismiss()))
@@ -977,32 +3766,63 @@ class DeckSelectionScreen(Screen):
         if not selected_file:
             App.get_running_app().show_popup("오류", "파일을 선택하세요.")
             return
-        try:
-            title_name = os.path.splitext(os.path.basename(selected_file))[0]
-            title_dir = os.path.join(self.app_dir, 'decks', title_name)
-            if not os.path.exists(title_dir):
-                os.makedirs(title_dir, exist_ok=True)
-            if selected_file.endswith('.json'):
-                with open(selected_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-            elif selected_file.endswith('.txt'):
-                data = []
-                with open(selected_file, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        front, back = line.strip().split('-', 1)
-                        data.append({'front': front.strip(), 'back': back.strip(), 'starred': False})
-            else:
-                App.get_running_app().show_popup("오류", "지원하지 않는 파일 형식입니다.")
+        title_name = os.path.splitext(os.path.basename(selected_file))[0]
+        title_dir = os.path.join(self.app_dir, 'decks', title_name)
+        self.file_popup.dismiss()
+        self.run_import(selected_file, title_dir, self.load_decks)
+
+    def run_import(self, selected_file, deck_dir, on_done):
+        # 불러오기는 별도 스레드에서 하고, 진행 상황만 Clock으로 화면에 반영
+        font_path = os.path.join(os.getcwd(), 'fonts', 'NanumGothic-Regular.ttf')
+        content = BoxLayout(orientation='vertical')
+        progress_bar = ProgressBar(max=100, value=0)
+        status_label = Label(text='불러오는 중...', font_name=font_path)
+        content.add_widget(status_label)
+        content.add_widget(progress_bar)
+        progress_popup = Popup(title='파일 불러오기', content=content, size_hint=(0.7, 0.3), auto_dismiss=False)
+        progress_popup.open()
+        App.get_running_app().deck_saver.flush()  # 합칠 단어장에 아직 기록되지 않은 변경이 없게 함
+        last_percent = [-1]
+
+        def show_progress(read_bytes, total_bytes):
+            percent = int(read_bytes * 100 / total_bytes) if total_bytes else 100
+            if percent != last_percent[0]:
+                last_percent[0] = percent
+                Clock.schedule_once(lambda dt: setattr(progress_bar, 'value', percent))
+
+        def finish(result, error):
+            progress_popup.dismiss()
+            app = App.get_running_app()
+            if error is not None:
+                app.show_popup("오류", f"파일 불러오기 실패: {str(error)}")
+                print(f"파일 불러오기 오류: {error}")
                 return
-            flashcards_path = os.path.join(title_dir, 'flashcards.json')
-            with open(flashcards_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            print(f"단어장 불러오기 성공: {title_name}")
-            self.file_popup.dismiss()
-            self.load_decks()
-        except Exception as e:
-            App.get_running_app().show_popup("오류", f"파일 불러오기 실패: {str(e)}")
-            print(f"파일 불러오기 오류: {e}")
+            count, duplicate_count, bad_count, bad_lines = result
+            print(f"단어장 불러오기 성공: {deck_dir} ({count}개, 중복 {duplicate_count}개, 잘못된 줄 {bad_count}개)")
+            if duplicate_count or bad_count:
+                message = f"{count}개의 카드를 불러왔습니다."
+                if duplicate_count:
+                    message += f"\n이미 있는 카드 {duplicate_count}개는 건너뛰었습니다."
+                if bad_count:
+                    details = ', '.join(str(number) for number, _ in bad_lines)
+                    more = ' ...' if bad_count > len(bad_lines) else ''
+                    message += f"\n잘못된 줄 {bad_count}개: {details}{more}"
+                app.show_popup("알림", message)
+            if app.current_deck and os.path.abspath(os.path.join(self.app_dir, 'decks', app.current_deck)) == os.path.abspath(deck_dir):
+                app.load_cards()  # 지금 열려 있는 단어장에 합쳤으면 다시 불러옴
+            on_done()
+
+        def worker():
+            try:
+                result = import_cards_file(selected_file, deck_dir, show_progress)
+                App.get_running_app().deck_catalog.refresh_deck_dir(deck_dir)
+                App.get_running_app().refresh_search_deck(deck_dir)
+                Clock.schedule_once(lambda dt: finish(result, None))
+            except Exception as e:
+                error = e  # except 블록이 끝나면 e가 지워지므로 따로 잡아 둠
+                Clock.schedule_once(lambda dt, error=error: finish(None, error))
+
+        threading.Thread(target=worker, daemon=True).start()
 
     def go_back(self, instance):
         if self.current_title:
@@ -1033,14 +3853,16 @@ class DeckSelectionScreen(Screen):
         deck_list = BoxLayout(orientation='vertical', spacing=1, size_hint_y=None)
         deck_list.bind(minimum_height=deck_list.setter('height'))
         
-        deck_dir = os.path.join(self.app_dir, 'decks', title_name)
-        for deck_name in os.listdir(deck_dir):
-            if os.path.isdir(os.path.join(deck_dir, deck_name)):
-                deck_layout = BoxLayout(orientation='horizontal', size_hint_y=None, height=50)
-                deck_layout.add_widget(Button(text=deck_name, font_name=font_path, on_press=lambda x, dn=deck_name: self.select_deck(dn)))
-                deck_layout.add_widget(Button(text='설정', font_name=font_path, on_press=lambda x, dn=deck_name: self.configure_deck(deck_name=dn, title_name=title_name)))
-                deck_layout.add_widget(Button(text='삭제', font_name=font_path, on_press=lambda x, dn=deck_name: self.delete_deck(title_name, dn)))
-                deck_list.add_widget(deck_layout)
+        for deck_name, entry in App.get_running_app().deck_catalog.decks(title_name).items():
+            label = f"{deck_name} ({entry.get('cards', 0)}개"
+            if entry.get('last_studied'):
+                label += time.strftime(', 최근 학습 %m/%d', time.localtime(entry['last_studied']))
+            label += ')'
+            deck_layout = BoxLayout(orientation='horizontal', size_hint_y=None, height=50)
+            deck_layout.add_widget(Button(text=label, font_name=font_path, on_press=lambda x, dn=deck_name: self.select_deck(dn)))
+            deck_layout.add_widget(Button(text='설정', font_name=font_path, on_press=lambda x, dn=deck_name: self.configure_deck(deck_name=dn, title_name=title_name)))
+            deck_layout.add_widget(Button(text='삭제', font_name=font_path, on_press=lambda x, dn=deck_name: self.delete_deck(title_name, dn)))
+            deck_list.add_widget(deck_layout)
         
         scroll_view.add_widget(deck_list)
         self.layout.add_widget(scroll_view)
@@ -1048,7 +3870,7 @@ class DeckSelectionScreen(Screen):
     def open_subdeck_file_chooser(self, title_name):
         font_path = os.path.join(os.getcwd(), 'fonts', 'NanumGothic-Regular.ttf')
         content = BoxLayout(orientation='vertical')
-        self.subdeck_file_chooser = FileChooserListView(path=os.getcwd(), filters=['*.json', '*.txt'])
+        self.subdeck_file_chooser = FileChooserListView(path=os.getcwd(), filters=['*.json', '*.txt', '*.tsv', '*.csv'])
         content.add_widget(self.subdeck_file_chooser)
         content.add_widget(Button(text='불러오기', font_name=font_path, on_press=lambda x: self.import_deck_to_subdeck(title_name)))
         content.add_widget(Button(text='취소', font_name=font_path, on_press=lambda x: self.subdeck_file_popup.dismiss()))
@@ -1060,32 +3882,10 @@ class DeckSelectionScreen(Screen):
         if not selected_file:
             App.get_running_app().show_popup("오류", "파일을 선택하세요.")
             return
-        try:
-            deck_name = os.path.splitext(os.path.basename(selected_file))[0]
-            deck_dir = os.path.join(self.app_dir, 'decks', title_name, deck_name)
-            if not os.path.exists(deck_dir):
-                os.makedirs(deck_dir, exist_ok=True)
-            if selected_file.endswith('.json'):
-                with open(selected_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-            elif selected_file.endswith('.txt'):
-                data = []
-                with open(selected_file, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        front, back = line.strip().split('-', 1)
-                        data.append({'front': front.strip(), 'back': back.strip(), 'starred': False})
-            else:
-                App.get_running_app().show_popup("오류", "지원하지 않는 파일 형식입니다.")
-                return
-            flashcards_path = os.path.join(deck_dir, 'flashcards.json')
-            with open(flashcards_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            print(f"하위 단어장 불러오기 성공: {deck_name}")
-            self.subdeck_file_popup.dismiss()
-            self.show_deck_options(title_name)
-        except Exception as e:
-            App.get_running_app().show_popup("오류", f"파일 불러오기 실패: {str(e)}")
-            print(f"파일 불러오기 오류: {e}")
+        deck_name = os.path.splitext(os.path.basename(selected_file))[0]
+        deck_dir = os.path.join(self.app_dir, 'decks', title_name, deck_name)
+        self.subdeck_file_popup.dismiss()
+        self.run_import(selected_file, deck_dir, lambda: self.show_deck_options(title_name))
 
     def add_new_deck(self, title_name):
         font_path = os.path.join(os.getcwd(), 'fonts', 'NanumGothic-Regular.ttf')
@@ -1118,6 +3918,7 @@ class DeckSelectionScreen(Screen):
                 settings_path = os.path.join(deck_dir, 'settings.json')
                 with open(settings_path, 'w', encoding='utf-8') as f:
                     json.dump(settings, f, ensure_ascii=False, indent=2)
+                App.get_running_app().deck_catalog.update_deck(title_name, deck_name, front_lang=front_lang, back_lang=back_lang)
                 print(f"새 단어장 저장: {deck_dir}")
                 self.show_deck_options(title_name)
             else:
@@ -1149,6 +3950,7 @@ class DeckSelectionScreen(Screen):
         settings_path = os.path.join(deck_dir, 'settings.json')
         with open(settings_path, 'w', encoding='utf-8') as f:
             json.dump(settings, f, ensure_ascii=False, indent=2)
+        App.get_running_app().deck_catalog.update_deck(self.title_name, self.deck_name, front_lang=front_lang, back_lang=back_lang)
         self.show_deck_options(self.title_name)
 
     def select_deck(self, deck_name):
@@ -1161,11 +3963,82 @@ class DeckSelectionScreen(Screen):
     def delete_deck(self, title_name, deck_name):
         deck_dir = os.path.join(self.app_dir, 'decks', title_name, deck_name)
         if os.path.exists(deck_dir):
+            App.get_running_app().deck_saver.flush()
+            open_deck_store(deck_dir).drop()
             import shutil
             shutil.rmtree(deck_dir)
+            App.get_running_app().deck_catalog.remove_deck(title_name, deck_name)
+            App.get_running_app().search_index.remove_deck(os.path.join(title_name, deck_name))
+            scheduler = App.get_running_app().schedulers.pop(os.path.join(title_name, deck_name), None)
+            if scheduler:
+                scheduler.close()
             self.show_deck_options(title_name)
 
+def render_deck_audio(deck_path, workers=4, word_language=None, meaning_language=None,
+                      word_voice=None, meaning_voice=None, tts_client=None):
+    """단어장의 모든 카드 음성을 단어장 audio 디렉토리에 합성 (이미 있는 오디오는 건너뜀)"""
+    deck_dir = deck_path if os.path.isdir(deck_path) else os.path.dirname(os.path.abspath(deck_path))
+    cards = open_deck_store(deck_dir).open_cards()
+    settings = {}
+    settings_path = os.path.join(deck_dir, 'settings.json')
+    if os.path.exists(settings_path):
+        with open(settings_path, 'r', encoding='utf-8') as f:
+            settings = json.load(f)
+    word_language = word_language or DECK_LANGUAGE_CODES.get(settings.get('front_lang'), 'en-US')
+    meaning_language = meaning_language or DECK_LANGUAGE_CODES.get(settings.get('back_lang'), 'ko-KR')
+    word_voice = word_voice or VOICE_OPTIONS[word_language][0]
+    meaning_voice = meaning_voice or VOICE_OPTIONS[meaning_language][0]
+
+    # 파일은 임시 파일에 쓴 뒤 교체하므로, 중단 후 다시 실행하면 끝난 카드는 자연스럽게 건너뜀
+    cache = AudioCache(os.path.join(deck_dir, DECK_AUDIO_DIR_NAME), max_bytes=None)
+    pending = OrderedDict()
+    for card in cards.window(0, len(cards)):
+        for text, language, voice in ((card['front'], word_language, word_voice),
+                                      (card['back'], meaning_language, meaning_voice)):
+            voice_name = tts_cache_voice(voice, tts_client)
+            if text and cache.get(text, language, voice_name) is None:
+                pending[(text, language, voice_name)] = voice
+    skipped = len(cards) * 2 - len(pending)
+    print(f"렌더링 대상: {len(pending)}개, 이미 있음: {skipped}개")
+
+    def render(text, language, voice_name, voice):
+        cache.put(text, language, voice_name, synthesize_audio(text, language, voice, tts_client))
+
+    rendered = failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(render, *key, voice): key for key, voice in pending.items()}
+        for future in as_completed(futures):
+            try:
+                future.result()
+                rendered += 1
+            except Exception as e:
+                failed += 1
+                print(f"합성 실패: {futures[future][0]} ({e})")
+            if (rendered + failed) % 50 == 0:
+                print(f"진행: {rendered + failed}/{len(pending)}")
+    print(f"렌더링 완료: {rendered}개, 실패: {failed}개")
+    return rendered, skipped, failed
+
+def run_command_line(argv):
+    parser = argparse.ArgumentParser(prog='main.py render', description='단어장 오디오 일괄 렌더링')
+    parser.add_argument('deck_path', help='decks/<제목>/<단어장>/flashcards.json 또는 단어장 디렉토리')
+    parser.add_argument('--workers', type=int, default=4, help='동시 합성 요청 수')
+    parser.add_argument('--word-lang', help='단어 언어 코드 (기본값: settings.json)')
+    parser.add_argument('--meaning-lang', help='의미 언어 코드 (기본값: settings.json)')
+    parser.add_argument('--word-voice', help='단어 음성 이름')
+    parser.add_argument('--meaning-voice', help='의미 음성 이름')
+    parser.add_argument('--google', action='store_true', help='gTTS 대신 Google Cloud TTS 사용')
+    args = parser.parse_args(argv)
+    tts_client = load_google_tts().TextToSpeechClient() if args.google else None
+    _, _, failed = render_deck_audio(args.deck_path, workers=args.workers,
+                                     word_language=args.word_lang, meaning_language=args.meaning_lang,
+                                     word_voice=args.word_voice, meaning_voice=args.meaning_voice,
+                                     tts_client=tts_client)
+    return 1 if failed else 0
+
 if __name__ == '__main__':
+    if HEADLESS_MODE:
+        sys.exit(run_command_line(sys.argv[2:]))
     try:
         FlashcardApp().run()
     except Exception as e: